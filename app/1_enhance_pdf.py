@@ -6,47 +6,28 @@ ENTRADA: PDF escaneado (solo imagen)
 SALIDA: PDF con capa de texto invisible
 """
 import sys
-import argparse
 from pathlib import Path
+from cli_args import parse_args
 from services.ocrmypdf_processor import OCRmyPDFService
 
 
 def main():
-    parser = argparse.ArgumentParser(
-        description="Mejora PDFs escaneados añadiendo capa de texto invisible con OCRmyPDF"
+    args = parse_args(
+        "Mejora PDFs escaneados añadiendo capa de texto invisible con OCRmyPDF",
+        ("source", "PDF o carpeta con PDFs escaneados"),
+        {
+            "--output-dir": ("ocr_processed", str, "Carpeta donde guardar PDFs mejorados (default: ocr_processed)"),
+            "--output-subdir": (None, str, "Subcarpeta para organizar (ej: 2020)"),
+            "--language": ("spa", str, "Código de idioma (default: spa para español)"),
+            "--workers": (None, int, "PDFs procesados a la vez (default: uno por núcleo para PDFs de menos de 10 páginas, raíz cuadrada de los núcleos para los más largos)"),
+            "--jobs": (None, int, "Núcleos usados por cada ejecución de ocrmypdf (default: 1 para PDFs de menos de 10 páginas, raíz cuadrada de los núcleos para los más largos)"),
+            "--fast": (False, bool, "Modo rápido: omite páginas con texto, usa solo el motor LSTM de Tesseract y no optimiza el PDF"),
+            "--chunk-size": (1024, int, "PDFs listados y procesados a la vez, para acotar la memoria en carpetas enormes (default: 1024)"),
+            "--force": (False, bool, "Volver a procesar también los PDFs ya mejorados en otra ejecución"),
+            "--summary": (False, bool, "Mostrar resumen detallado"),
+        }
     )
     
-    parser.add_argument(
-        "source",
-        help="PDF o carpeta con PDFs escaneados"
-    )
-    
-    parser.add_argument(
-        "--output-dir",
-        help="Carpeta donde guardar PDFs mejorados (default: ocr_processed)",
-        default="ocr_processed"
-    )
-    
-    parser.add_argument(
-        "--output-subdir",
-        help="Subcarpeta para organizar (ej: 2020)",
-        default=None
-    )
-    
-    parser.add_argument(
-        "--language",
-        help="Código de idioma (default: spa para español)",
-        default="spa"
-    )
-    
-    parser.add_argument(
-        "--summary",
-        help="Mostrar resumen detallado",
-        action="store_true"
-    )
-    
-    args = parser.parse_args()
-    
     source_path = Path(args.source)
     
     if not source_path.exists():
@@ -54,7 +35,7 @@ def main():
         sys.exit(1)
     
     try:
-        service = OCRmyPDFService(output_dir=args.output_dir)
+        service = OCRmyPDFService(output_dir=args.output_dir, fast=args.fast)
         
         if source_path.is_file() and source_path.suffix.lower() == ".pdf":
             print("Mejorando PDF: " + source_path.name)
@@ -64,24 +45,30 @@ def main():
                 args.language
             )
             
-            if result["status"] == "success":
+            if result.status == "success":
                 print(f"✓ Exitoso")
                 print(f"  Entrada:  {source_path}")
-                print(f"  Salida:   {result['output_path']}")
-                print(f"  Tamaño:   {result['file_size_kb']} KB")
+                print(f"  Salida:   {result.output_path}")
+                print(f"  Tamaño:   {result.file_size_kb} KB")
             else:
-                print(f"✗ Error: {result['message']}")
+                print(f"✗ Error: {result.message}")
                 sys.exit(1)
         
         elif source_path.is_dir():
             print(f"Mejorando PDFs en: {source_path}")
             print(f"Idioma: {args.language}\n")
             
-            results = service.enhance_directory(
-                str(source_path),
-                args.output_subdir,
-                args.language
-            )
+            # Mantener OCRmyPDF cargado para todos los archivos de la carpeta
+            with service:
+                results = service.enhance_directory(
+                    str(source_path),
+                    args.output_subdir,
+                    args.language,
+                    workers=args.workers,
+                    jobs=args.jobs,
+                    force=args.force,
+                    chunk_size=args.chunk_size
+                )
             
             if args.summary:
                 summary = service.processor.get_summary(results)
@@ -91,6 +78,7 @@ def main():
                 print(f"Total procesado: {summary['total_processed']}")
                 print(f"Exitosos: {summary['successful']}")
                 print(f"Errores: {summary['failed']}")
+                print(f"Omitidos (ya procesados): {summary['skipped']}")
                 print(f"Tamaño total: {summary['total_size_kb']} KB")
                 print(f"Guardado en: {summary['output_directory']}")
                 
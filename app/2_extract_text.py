@@ -7,41 +7,31 @@ CREAR: carpeta data_result/ con archivos .txt
 SALIDA: Archivo .txt con texto extraído
 """
 import sys
-import argparse
 from pathlib import Path
+from cli_args import parse_args
+from config import OCR_DPI
 from services.ocr_processor import OCRProcessor
 
 
 def main():
-    parser = argparse.ArgumentParser(
-        description="Extrae texto de PDFs mediante OCR y lo guarda en archivos .txt"
+    args = parse_args(
+        "Extrae texto de PDFs mediante OCR y lo guarda en archivos .txt",
+        ("source_dir", "Carpeta con PDFs para procesar"),
+        {
+            "--file": (None, str, "Procesar solo un archivo (ej: documento.pdf)"),
+            "--output-dir": (None, str, "Carpeta personalizada para archivos .txt"),
+            "--force-ocr": (False, bool, "Aplicar OCR a todas las páginas aunque el PDF ya tenga texto"),
+            "--language": ("spa", str, "Código de idioma para Tesseract (default: spa para español)"),
+            "--psm": (6, int, "Modo de segmentación de Tesseract (default: 6 = bloque uniforme; 12 = texto disperso)"),
+            "--oem": (1, int, "Motor de Tesseract (default: 1 = solo LSTM)"),
+            "--dpi": (OCR_DPI, int, f"Resolución para rasterizar páginas escaneadas (default: {OCR_DPI}; 200 basta para facturas impresas)"),
+            "--no-binarize": (False, bool, "No binarizar (Otsu) las páginas escaneadas antes del OCR"),
+            "--jobs": (None, int, "PDFs procesados en paralelo (default: mitad de los núcleos)"),
+            "--force": (False, bool, "Volver a procesar también los PDFs ya procesados en otra ejecución"),
+            "--summary": (False, bool, "Mostrar resumen detallado"),
+        }
     )
     
-    parser.add_argument(
-        "source_dir",
-        help="Carpeta con PDFs para procesar"
-    )
-    
-    parser.add_argument(
-        "--file",
-        help="Procesar solo un archivo (ej: documento.pdf)",
-        default=None
-    )
-    
-    parser.add_argument(
-        "--output-dir",
-        help="Carpeta personalizada para archivos .txt",
-        default=None
-    )
-    
-    parser.add_argument(
-        "--summary",
-        help="Mostrar resumen detallado",
-        action="store_true"
-    )
-    
-    args = parser.parse_args()
-    
     source_path = Path(args.source_dir)
     
     if not source_path.exists():
@@ -53,7 +43,16 @@ def main():
         sys.exit(1)
     
     try:
-        processor = OCRProcessor(str(source_path), args.output_dir)
+        processor = OCRProcessor(
+            str(source_path),
+            args.output_dir,
+            force_ocr=args.force_ocr,
+            language=args.language,
+            psm=args.psm,
+            oem=args.oem,
+            binarize=not args.no_binarize,
+            dpi=args.dpi
+        )
         
         print(f"Extrayendo texto de PDFs...")
         print(f"Entrada:   {source_path}")
@@ -62,17 +61,17 @@ def main():
         if args.file:
             print(f"Procesando: {args.file}\n")
             result = processor.process_single_file(args.file)
-            print(f"Estado: {result['status']}")
-            if result['status'] == 'success':
+            print(f"Estado: {result.status}")
+            if result.status == 'success':
                 print(f"✓ Exitoso")
-                print(f"  Caracteres extraídos: {result['characters_extracted']}")
-                print(f"  Guardado en: {result['output_path']}")
+                print(f"  Caracteres extraídos: {result.characters_extracted}")
+                print(f"  Guardado en: {result.output_path}")
             else:
-                print(f"✗ Error: {result['message']}")
+                print(f"✗ Error: {result.message}")
                 sys.exit(1)
         else:
             print("Procesando todos los PDFs...\n")
-            results = processor.process_directory()
+            results = processor.process_directory(jobs=args.jobs, force=args.force)
             
             if args.summary:
                 summary = processor.get_summary(results)
@@ -82,6 +81,7 @@ def main():
                 print(f"Total procesado: {summary['total_processed']}")
                 print(f"Exitosos: {summary['successful']}")
                 print(f"Errores: {summary['failed']}")
+                print(f"Omitidos (ya procesados): {summary['skipped']}")
                 print(f"Carpeta salida: {summary['output_directory']}")
                 
                 if summary['failed_files']:
@@ -5,43 +5,28 @@ Extrae datos específicos del texto OCR y los organiza en JSON.
 ENTRADA: Archivo .txt con texto OCR o carpeta con múltiples .txt
 SALIDA: Archivo .json con datos estructurados
 """
+import os
 import sys
-import argparse
 from pathlib import Path
-import json
-from services.data_parser import DataParserService
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from cli_args import parse_args
+from services.data_parser import DataParserService, dumps_json
 
 
 def main():
-    parser = argparse.ArgumentParser(
-        description="Convierte archivos .txt OCR en JSON estructurado"
+    args = parse_args(
+        "Convierte archivos .txt OCR en JSON estructurado",
+        ("source", "Archivo .txt o carpeta con archivos .txt"),
+        {
+            "--output-subdir": (None, str, "Subcarpeta para organizar JSONs (ej: 2020)"),
+            "--output-dir": ("invoices_json", str, "Carpeta base para guardar JSONs (default: invoices_json)"),
+            "--jobs": (None, int, "Número de procesos para parsear en paralelo (default: núcleos de CPU)"),
+            "--ndjson": (None, str, "Guardar la carpeta en un solo archivo .ndjson (una línea por .txt)"),
+            "--summary": (False, bool, "Mostrar resumen detallado"),
+        }
     )
     
-    parser.add_argument(
-        "source",
-        help="Archivo .txt o carpeta con archivos .txt"
-    )
-    
-    parser.add_argument(
-        "--output-subdir",
-        help="Subcarpeta para organizar JSONs (ej: 2020)",
-        default=None
-    )
-    
-    parser.add_argument(
-        "--output-dir",
-        help="Carpeta base para guardar JSONs (default: invoices_json)",
-        default="invoices_json"
-    )
-    
-    parser.add_argument(
-        "--summary",
-        help="Mostrar resumen detallado",
-        action="store_true"
-    )
-    
-    args = parser.parse_args()
-    
     source_path = Path(args.source)
     
     if not source_path.exists():
@@ -55,48 +40,74 @@ def main():
             print(f"Parseando archivo: {source_path.name}\n")
             result = parser_service.parse_txt_file(source_path, args.output_subdir)
             
-            if result["status"] == "success":
+            if result.status == "success":
                 print(f"✓ Exitoso")
                 print(f"  Entrada:  {source_path}")
-                print(f"  Salida:   {result['output_file']}")
+                print(f"  Salida:   {result.output_file}")
                 print(f"\nDatos extraídos:")
-                print(json.dumps(result['data'], indent=2, ensure_ascii=False))
+                sys.stdout.flush()
+                sys.stdout.buffer.write(dumps_json(result.data) + b"\n")
+                sys.stdout.buffer.flush()
             else:
-                print(f"✗ Error: {result['message']}")
+                print(f"✗ Error: {result.message}")
                 sys.exit(1)
         
         elif source_path.is_dir():
             print(f"Parseando archivos .txt en: {source_path}\n")
-            txt_files = sorted(source_path.glob("*.txt"))
+            with os.scandir(source_path) as entries:
+                txt_files = sorted(
+                    entry.path for entry in entries
+                    if entry.name.endswith(".txt") and entry.is_file()
+                )
             
             if not txt_files:
                 print(f"No hay archivos .txt en {source_path}")
                 sys.exit(1)
             
-            results = []
-            for txt_file in txt_files:
-                result = parser_service.parse_txt_file(txt_file, args.output_subdir)
-                results.append(result)
-                
-                status = "✓" if result["status"] == "success" else "✗"
-                print(f"{status} {txt_file.name}")
+            if args.ndjson:
+                # Un único archivo NDJSON en lugar de un .json por archivo
+                results = parser_service.parse_txt_dir_batched(source_path, args.ndjson)
+                for result in results:
+                    status = "✓" if result.status == "success" else "✗"
+                    print(f"{status} {os.path.basename(result.source_file)}")
+            else:
+                # Cada archivo es independiente: se reparten entre procesos,
+                # unos 4 lotes por proceso para amortizar la comunicación
+                results = []
+                parse_file = partial(
+                    parser_service.parse_txt_file, output_subdir=args.output_subdir, return_data=False
+                )
+                jobs = args.jobs or os.cpu_count() or 1
+                chunksize = max(1, len(txt_files) // (4 * jobs))
+                with ProcessPoolExecutor(max_workers=jobs) as executor:
+                    parsed = executor.map(parse_file, txt_files, chunksize=chunksize)
+                    for txt_file, result in zip(txt_files, parsed):
+                        results.append(result)
+                        
+                        status = "✓" if result.status == "success" else "✗"
+                        print(f"{status} {os.path.basename(txt_file)}")
             
             if args.summary:
-                successful = [r for r in results if r["status"] == "success"]
-                failed = [r for r in results if r["status"] == "error"]
+                successful_count = 0
+                failed = []
+                for r in results:
+                    if r.status == "success":
+                        successful_count += 1
+                    else:
+                        failed.append(r)
                 
                 print(f"\n{'='*60}")
                 print("RESUMEN: Parseo a JSON")
                 print(f"{'='*60}")
                 print(f"Total procesado: {len(results)}")
-                print(f"Exitosos: {len(successful)}")
+                print(f"Exitosos: {successful_count}")
                 print(f"Errores: {len(failed)}")
                 print(f"Carpeta salida: {args.output_dir}")
                 
                 if failed:
                     print(f"\nArchivos con error:")
                     for r in failed:
-                        print(f"  - {Path(r.get('source_file', 'unknown')).name}: {r.get('message')}")
+                        print(f"  - {Path(r.source_file or 'unknown').name}: {r.message}")
         
         else:
             print("Error: Debe ser un archivo .txt o una carpeta")
@@ -104,8 +115,9 @@ def main():
     
     except Exception as e:
         print(f"Error: {e}")
-        import traceback
-        traceback.print_exc()
+        if os.environ.get("SPACEFOOD_DEBUG"):
+            import traceback
+            traceback.print_exc()
         sys.exit(1)
 
 
@@ -207,7 +207,7 @@ Sistema:
   brew install tesseract tesseract-lang ghostscript
 
 Python:
-  pip install pytesseract pdf2image opencv-python pillow ocrmypdf
+  pip install pytesseract pymupdf opencv-python pillow ocrmypdf
 
 Verificar:
   tesseract --list-langs    (debe incluir 'spa')
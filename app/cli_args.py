@@ -0,0 +1,71 @@
+"""
+Parser mínimo de argumentos para los scripts 1_, 2_ y 3_.
+Sustituye a argparse, cuya importación y construcción cuestan decenas de ms
+en cada arranque; eso se nota cuando los scripts se lanzan una vez por archivo
+(find ... -exec, GNU parallel).
+"""
+import sys
+from types import SimpleNamespace
+
+
+def parse_args(description, positional, options, argv=None):
+    """
+    Recorre argv una sola vez y devuelve los argumentos como atributos.
+
+    Args:
+        description: Texto mostrado con -h/--help
+        positional: Tupla (nombre, ayuda) del único argumento posicional
+        options: Diccionario {"--opcion": (default, tipo, ayuda)}; tipo bool
+                 indica un flag sin valor
+        argv: Argumentos a parsear (default: sys.argv[1:])
+
+    Returns:
+        SimpleNamespace con el posicional y las opciones (guiones -> "_")
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    values = {name[2:].replace("-", "_"): spec[0] for name, spec in options.items()}
+    positional_name, positional_help = positional
+    positional_value = None
+
+    def fail(message):
+        print(f"Error: {message}", file=sys.stderr)
+        print(f"Uso: {sys.argv[0]} {positional_name} [opciones] (ver --help)", file=sys.stderr)
+        sys.exit(2)
+
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        i += 1
+        if arg in ("-h", "--help"):
+            print(f"{description}\n\n  {positional_name:<18}{positional_help}")
+            for name, (_, _, help_text) in options.items():
+                print(f"  {name:<18}{help_text}")
+            sys.exit(0)
+
+        if not arg.startswith("--"):
+            if positional_value is not None:
+                fail(f"argumento no reconocido: {arg}")
+            positional_value = arg
+            continue
+
+        name, has_value, value = arg.partition("=")
+        if name not in options:
+            fail(f"opción no reconocida: {name}")
+        default, kind, _ = options[name]
+        if kind is bool:
+            values[name[2:].replace("-", "_")] = True
+            continue
+        if not has_value:
+            if i >= len(argv):
+                fail(f"{name} necesita un valor")
+            value = argv[i]
+            i += 1
+        try:
+            values[name[2:].replace("-", "_")] = kind(value)
+        except ValueError:
+            fail(f"valor no válido para {name}: {value}")
+
+    if positional_value is None:
+        fail(f"falta el argumento {positional_name}")
+    values[positional_name] = positional_value
+    return SimpleNamespace(**values)
@@ -14,5 +14,10 @@ RESULT_DIR = PROJECT_ROOT / "app" / "data_result"
 # Supported file types
 SUPPORTED_FORMATS = [".pdf"]
 
+# Resolution used to rasterize scanned pages before OCR.
+# Tesseract's LSTM models are most accurate around 300 DPI: lower values lose
+# accuracy, higher values only add pixels (memory per page grows with DPI²).
+OCR_DPI = 300
+
 # Logging
 LOG_LEVEL = "INFO"
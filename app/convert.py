@@ -1,51 +1,273 @@
-import pytesseract
-from pdf2image import convert_from_path
-import cv2
-import numpy as np
+import fitz  # PyMuPDF
 import os
+import sys
+import atexit
+import importlib.util
+import multiprocessing
+import hashlib
+import sqlite3
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from config import OCR_DPI
+
+# Optional: keeps one Tesseract engine loaded per worker (pip install tesserocr).
+# Only imported once OMP_THREAD_LIMIT is set: OpenMP reads it when the library
+# is loaded, not afterwards.
+HAS_TESSEROCR = importlib.util.find_spec("tesserocr") is not None
+
+# On Linux the OCR workers are forked: the model loaded once in the parent is
+# inherited copy-on-write instead of being loaded again by every worker.
+# Elsewhere (spawn) each worker loads its own copy in _init_ocr_worker.
+SHARE_MODEL_VIA_FORK = sys.platform.startswith("linux")
 
 # install with brew Tesseract or Poppler
 
-def ocr_pdf(pdf_path):
+# Pages whose embedded text layer is shorter than this are treated as scanned
+MIN_TEXT_LAYER_CHARS = 50
+# Tesseract settings: LSTM engine (OEM 1) on a single uniform block of text (PSM 6),
+# which skips orientation detection and layout analysis on invoice-like pages.
+# PSM 12 (sparse text with OSD) is the alternative to benchmark on loose layouts.
+OCR_LANGUAGE = 'spa'
+OCR_PSM = 6
+OCR_OEM = 1
+# Persistent cache of OCR results keyed by the hash of the rendered page
+OCR_CACHE_PATH = 'data_result/ocr_cache.sqlite3'
+
+# Tesseract engine owned by the current process (tesserocr only)
+_tess_api = None
+_tess_settings = None
+# Whether this module imported tesserocr with OpenMP limited to one thread
+_tesserocr_limited = False
+
+
+def _end_tess_api():
+    if _tess_api is not None:
+        _tess_api.End()
+
+
+atexit.register(_end_tess_api)
+
+
+def _import_tesserocr_limited():
+    """
+    Imports tesserocr with OMP_THREAD_LIMIT=1 set only for the import, so the
+    caller's environment is left as it was. Returns False if tesserocr had
+    already been imported elsewhere, where the limit may not have applied.
+    """
+    global _tesserocr_limited
+    if _tesserocr_limited or "tesserocr" in sys.modules:
+        return _tesserocr_limited
+
+    previous = os.environ.get("OMP_THREAD_LIMIT")
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+    try:
+        import tesserocr  # noqa: F401
+    finally:
+        if previous is None:
+            del os.environ["OMP_THREAD_LIMIT"]
+        else:
+            os.environ["OMP_THREAD_LIMIT"] = previous
+    _tesserocr_limited = True
+    return True
+
+
+def _load_tess_api(language=OCR_LANGUAGE, psm=OCR_PSM, oem=OCR_OEM):
     """
-    Performs OCR on a PDF file and returns the extracted text.
+    Loads the Tesseract engine of the current process (tesserocr only),
+    unless one with the same settings is already loaded.
     """
-    # Convert PDF pages to a list of images
-    pages = convert_from_path(pdf_path) #, poppler_path=POPPLER_PATH) # Use poppler_path if needed
+    global _tess_api, _tess_settings
+    if _tess_settings != (language, psm, oem):
+        from tesserocr import PyTessBaseAPI
+        _end_tess_api()
+        _tess_api = PyTessBaseAPI(lang=language, psm=psm, oem=oem)
+        _tess_settings = (language, psm, oem)
+
 
-    extracted_text = ""
-    for page_num, page in enumerate(pages):
-        # Optional: Image preprocessing for better accuracy (convert to grayscale)
-        page_arr = np.array(page)
-        gray_image = cv2.cvtColor(page_arr, cv2.COLOR_BGR2GRAY)
-        
-        # Perform OCR on the image
-        text = pytesseract.image_to_string(gray_image)
-        extracted_text += f"\n--- Page {page_num + 1} ---\n"
-        extracted_text += text
+def _init_ocr_worker(language=OCR_LANGUAGE, psm=OCR_PSM, oem=OCR_OEM):
+    """
+    Restricts Tesseract to a single OpenMP thread inside each worker process.
+    Many single-threaded tesseract workers outperform a few multi-threaded ones.
+    When tesserocr is available, the engine and its model are loaded once here
+    and reused for every page the worker handles.
+    Only meant for spawned pool workers: it changes the process environment.
+    """
+    os.environ["OMP_THREAD_LIMIT"] = "1"
 
-    return extracted_text
+    if HAS_TESSEROCR:
+        _load_tess_api(language, psm, oem)
 
-def save_ocr_result(pdf_path, text_result, output_dir='data_result/2020'):
+
+def _binarize(page_arr):
     """
-    Saves the OCR result to a text file in the specified output directory.
+    Binarizes a grayscale page with Otsu's threshold.
+    Scan noise and gray backgrounds slow Tesseract's line recognizer down
+    and cost accuracy; a clean black/white image avoids both.
+    """
+    import cv2
+    _, bw_image = cv2.threshold(page_arr, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+    return bw_image
+
+
+def _ocr_page(page_num, page_arr, language=OCR_LANGUAGE, config="", binarize=True):
+    """
+    Performs OCR on a single rendered page (grayscale array) and returns (page_num, text).
+    """
+    if binarize:
+        page_arr = _binarize(page_arr)
+
+    if _tess_api is not None:
+        height, width = page_arr.shape
+        _tess_api.SetImageBytes(page_arr.tobytes(), width, height, 1, width)
+        return page_num, _tess_api.GetUTF8Text()
+
+    # Fallback: pytesseract spawns one tesseract process per page
+    import pytesseract
+    text = pytesseract.image_to_string(page_arr, lang=language, config=config)
+    return page_num, text
+
+
+def _open_ocr_cache(cache_path):
+    """
+    Opens (and creates if needed) the SQLite cache of OCR results.
+    """
+    Path(cache_path).parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(cache_path)
+    with conn:
+        conn.execute("CREATE TABLE IF NOT EXISTS ocr_cache (hash TEXT PRIMARY KEY, text TEXT)")
+    return conn
+
+
+def _page_hash(page_arr, language, config):
+    """
+    Returns a SHA-256 digest identifying a rendered page image and the
+    Tesseract settings used to read it.
+    """
+    digest = hashlib.sha256(f"{language} {config} {page_arr.shape}".encode())
+    digest.update(page_arr.data)
+    return digest.hexdigest()
+
+
+def iter_page_texts(pdf_path, max_workers=None, force_ocr=False, cache_path=OCR_CACHE_PATH,
+                    language=OCR_LANGUAGE, psm=OCR_PSM, oem=OCR_OEM, binarize=True):
+    """
+    Yields (page_num, text) for every page of a PDF file, in page order,
+    running OCR only where it is needed.
+    Born-digital pages already carry a text layer, which PyMuPDF reads directly;
+    the remaining (scanned) pages are rendered and recognized in parallel,
+    one tesseract process per CPU core. Use force_ocr=True to OCR every page.
+    Results are cached by page-image hash in cache_path (None disables the cache),
+    so re-runs and repeated pages skip Tesseract entirely.
+    Scanned pages are binarized (Otsu) before OCR unless binarize=False.
+    """
+    # Imported lazily: only needed when a page has to be rendered for OCR
+    import numpy as np
+
+    workers = max_workers or os.cpu_count() or 1
+    config = f"--oem {oem} --psm {psm}"
+
+    page_texts = {}
+    scanned_pages = []
+    with fitz.open(pdf_path) as doc:
+        page_count = doc.page_count
+        for page_num, page in enumerate(doc):
+            if not force_ocr:
+                text = page.get_text("text")
+                if len(text.strip()) >= MIN_TEXT_LAYER_CHARS:
+                    page_texts[page_num] = text
+                    continue
+
+            # Render straight to grayscale: no RGB buffer and no colorspace conversion
+            pix = page.get_pixmap(dpi=OCR_DPI, colorspace=fitz.csGRAY, alpha=False)
+            page_arr = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width)
+            scanned_pages.append((page_num, page_arr))
+
+    if not scanned_pages:
+        for page_num in range(page_count):
+            yield page_num, page_texts[page_num]
+        return
+
+    conn = _open_ocr_cache(cache_path) if cache_path else None
+    try:
+        page_hashes = {}
+        pending_pages = []
+        for page_num, page_arr in scanned_pages:
+            if conn is not None:
+                page_hashes[page_num] = _page_hash(page_arr, language, f"{config} binarize={binarize}")
+                row = conn.execute(
+                    "SELECT text FROM ocr_cache WHERE hash = ?", (page_hashes[page_num],)
+                ).fetchone()
+                if row is not None:
+                    page_texts[page_num] = row[0]
+                    continue
+            pending_pages.append((page_num, page_arr))
+
+        if not pending_pages:
+            for page_num in range(page_count):
+                yield page_num, page_texts[page_num]
+            return
+
+        if SHARE_MODEL_VIA_FORK and HAS_TESSEROCR and _import_tesserocr_limited():
+            # Load the model here, before the pool forks its workers. With
+            # OpenMP limited to one thread no OpenMP threads exist to break the fork
+            _load_tess_api(language, psm, oem)
+            pool_options = {"mp_context": multiprocessing.get_context("fork")}
+        else:
+            # Spawned workers start from a fresh interpreter: each one limits
+            # OpenMP and loads its engine before tesserocr is imported in it
+            pool_options = {
+                "mp_context": multiprocessing.get_context("spawn"),
+                "initializer": _init_ocr_worker,
+                "initargs": (language, psm, oem)
+            }
+
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(pending_pages)),
+            **pool_options
+        ) as executor:
+            futures = {
+                page_num: executor.submit(_ocr_page, page_num, page_arr, language, config, binarize)
+                for page_num, page_arr in pending_pages
+            }
+            for page_num in range(page_count):
+                if page_num in futures:
+                    _, text = futures.pop(page_num).result()
+                    if conn is not None:
+                        with conn:
+                            conn.execute(
+                                "INSERT OR REPLACE INTO ocr_cache (hash, text) VALUES (?, ?)",
+                                (page_hashes[page_num], text)
+                            )
+                else:
+                    text = page_texts.pop(page_num)
+                yield page_num, text
+    finally:
+        if conn is not None:
+            conn.close()
+
+
+def ocr_pdf(pdf_path, output_dir='data_result/2020', **options):
+    """
+    Extracts the text of a PDF file into {output_dir}/{filename}.txt and
+    returns the output path. Each page is written as soon as it is available,
+    so the whole document is never held in memory as a single string.
+    Keyword options are passed to iter_page_texts().
     """
     # Create output directory if it doesn't exist
     Path(output_dir).mkdir(parents=True, exist_ok=True)
-    
+
     # Get the filename without extension
     filename = os.path.splitext(os.path.basename(pdf_path))[0]
     output_path = os.path.join(output_dir, f'{filename}.txt')
-    
-    # Save the text result
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(text_result)
-    
+
+    with open(output_path, 'w', encoding='utf-8', buffering=1 << 20) as f:
+        for page_num, text in iter_page_texts(pdf_path, **options):
+            f.write(f"\n--- Page {page_num + 1} ---\n{text}")
+
     return output_path
 
-# Usage
-pdf_file_path = '/Users/alejandre/Developer/jatenx/spacefood/app/data/2020/4436.pdf'
-text_result = ocr_pdf(pdf_file_path)
-saved_path = save_ocr_result(pdf_file_path, text_result)
-print(f"OCR result saved to: {saved_path}")
\ No newline at end of file
+# Usage (guarded so worker processes can re-import this module safely)
+if __name__ == "__main__":
+    pdf_file_path = '/Users/alejandre/Developer/jatenx/spacefood/app/data/2020/4436.pdf'
+    saved_path = ocr_pdf(pdf_file_path)
+    print(f"OCR result saved to: {saved_path}")
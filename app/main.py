@@ -1,229 +1,493 @@
 """
 Main entry point for OCR batch processing.
 Allows flexible folder-based processing with simple CLI interface.
+Service modules are imported by each command handler, so a command only
+loads the OCR/HTTP stack it actually uses.
 """
 import sys
+import atexit
 import argparse
 from pathlib import Path
-import json
+from typing import Callable, Optional, Sequence, Union
 import os
-from services.ocr_processor import OCRProcessor
-from services.data_parser import DataParserService
-from services.ocrmypdf_processor import OCRmyPDFService
-from services.webhook_sender import WebhookSenderService
+import stat
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from functools import lru_cache, partial
 
 
-def resolve_path(path_str: str) -> Path:
+BANNER_50 = "=" * 50
+BANNER_60 = "=" * 60
+
+# Per-file progress lines written per write() call in long directory loops
+PROGRESS_BATCH = 64
+
+
+@lru_cache(maxsize=1)
+def _cwd() -> str:
+    """Current working directory, read once per process (main.py never chdirs)."""
+    return os.getcwd()
+
+
+def resolve_path(path_str: Union[str, os.PathLike]) -> Path:
     """
     Resolve a path that can be absolute or relative.
     If relative, resolve from the current working directory.
     If absolute, use as-is.
     """
-    path = Path(path_str)
+    path_str = os.fspath(path_str)
+    if os.path.isabs(path_str):
+        return Path(path_str)
+    
+    # Otherwise, make it absolute relative to cwd (lexically: no getcwd/stat calls)
+    return Path(os.path.normpath(os.path.join(_cwd(), path_str)))
+
+
+@dataclass(frozen=True, slots=True)
+class StattedPath:
+    """A resolved path with its os.stat() result, taken once per CLI invocation."""
+    path: Path
+    st: Optional[os.stat_result]
     
-    # If it's already absolute, return it
-    if path.is_absolute():
-        return path
+    @property
+    def kind(self) -> str:
+        """"file", "dir", "other" or "missing"."""
+        if self.st is None:
+            return "missing"
+        if stat.S_ISDIR(self.st.st_mode):
+            return "dir"
+        if stat.S_ISREG(self.st.st_mode):
+            return "file"
+        return "other"
     
-    # Otherwise, make it absolute relative to cwd
-    return Path.cwd() / path
+    @property
+    def is_dir(self) -> bool:
+        return self.kind == "dir"
 
 
-def main():
-    parser = argparse.ArgumentParser(
-        description="OCR Batch Processor - Process PDF files from a directory"
-    )
+@lru_cache(maxsize=1024)
+def stat_path(path_str: Union[str, os.PathLike]) -> StattedPath:
+    """
+    Resolve a path and stat it once
+    (instead of separate exists()/is_file()/is_dir() calls).
+    Memoized for the process: a CLI invocation is short-lived and every
+    check of the same path reuses the first stat.
+    """
+    path = resolve_path(path_str)
+    try:
+        st = os.stat(path)
+    except OSError:
+        # Missing, not a directory, permission denied, symlink loop...:
+        # treated as "not found", like Path.exists()
+        st = None
+    return StattedPath(path, st)
+
+
+def stat_source(path_str: str, require_dir: bool = False) -> StattedPath:
+    """
+    Resolve a source path and stat it once, exiting with an error if it
+    does not exist (or is not a directory when require_dir is set).
     
-    subparsers = parser.add_subparsers(dest="command", help="Command to execute")
+    Returns:
+        StattedPath of the source
+    """
+    source = stat_path(path_str)
+    if source.st is None:
+        if require_dir:
+            print(f"Error: Directory not found: {path_str}")
+            print(f"Resolved path: {source.path}")
+            print(f"Current working directory: {_cwd()}")
+        else:
+            print(f"Error: Path not found: {path_str}")
+        sys.exit(1)
+    
+    if require_dir and not source.is_dir:
+        print(f"Error: Path is not a directory: {source.path}")
+        sys.exit(1)
+    
+    return source
+
+
+def buffer_stdout(buffer_size: int = 1 << 16):
+    """
+    Replace stdout with a 64 KiB buffered writer when it is redirected to a
+    file or pipe, so per-file progress lines are written in large chunks.
+    An interactive terminal keeps line buffering.
+    """
+    if sys.stdout.isatty():
+        return
     
-    # OCR command
-    ocr_parser = subparsers.add_parser("ocr", help="Process PDFs to extract text")
-    ocr_parser.add_argument(
+    sys.stdout.flush()
+    sys.stdout = open(sys.stdout.fileno(), "w", buffering=buffer_size, encoding="utf-8", closefd=False)
+    atexit.register(sys.stdout.flush)
+
+
+def print_summary(
+    title: str,
+    banner: str,
+    lines: Sequence[str],
+    failed_lines: Sequence[str] = (),
+    file=None
+):
+    """Write a summary block (and its failed files, if any) in a single write (default: to stdout)."""
+    block = ["", banner, title, banner, *lines]
+    if failed_lines:
+        block += ["", "Failed files:", *failed_lines]
+    (file or sys.stdout).write("\n".join(block) + "\n")
+
+
+def emit_json(data):
+    """
+    Write data to stdout as indented JSON, encoded by dumps_json()
+    (orjson when installed) and written as bytes in one call.
+    Values JSON cannot encode (paths, dates...) are printed as strings.
+    """
+    from services.data_parser import dumps_json
+    
+    sys.stdout.flush()
+    sys.stdout.buffer.write(dumps_json(data, default=str) + b"\n")
+
+
+def add_ocr_arguments(parser: argparse.ArgumentParser):
+    """Arguments of the ocr command."""
+    parser.add_argument(
         "source_dir",
         help="Source directory containing PDF files to process (absolute or relative path)"
     )
-    ocr_parser.add_argument(
+    parser.add_argument(
         "--output-dir",
         help="Optional custom output directory (defaults to app/data_result/{year})",
         default=None
     )
-    ocr_parser.add_argument(
+    parser.add_argument(
         "--file",
         help="Process only a specific file (e.g., 4435.pdf)",
         default=None
     )
-    ocr_parser.add_argument(
+    parser.add_argument(
+        "--jobs",
+        help="PDFs processed in parallel (default: half the CPU cores)",
+        type=int,
+        default=None
+    )
+    parser.add_argument(
+        "--force",
+        help="Process every PDF again, even those already processed by a previous run",
+        action="store_true"
+    )
+    parser.add_argument(
         "--summary",
         help="Print summary after processing",
         action="store_true"
     )
-    
-    # Parse command
-    parse_parser = subparsers.add_parser("parse", help="Parse OCR text files to JSON")
-    parse_parser.add_argument(
+
+
+def add_parse_arguments(parser: argparse.ArgumentParser):
+    """Arguments of the parse command."""
+    parser.add_argument(
         "source",
         help="Source: either a directory with .txt files or a single .txt file"
     )
-    parse_parser.add_argument(
+    parser.add_argument(
         "--output-subdir",
         help="Optional subdirectory in invoices_json for output",
         default=None
     )
-    
-    # Process with parsing command
-    process_parser = subparsers.add_parser("process", help="OCR + Parse in one step")
-    process_parser.add_argument(
+    parser.add_argument(
+        "--jobs",
+        help="Number of processes parsing in parallel (default: CPU cores)",
+        type=int,
+        default=None
+    )
+    parser.add_argument(
+        "--no-cache",
+        help="Parse every file again, even if its content is unchanged since the last run",
+        action="store_true"
+    )
+
+
+def add_process_arguments(parser: argparse.ArgumentParser):
+    """Arguments of the process command."""
+    parser.add_argument(
         "source_dir",
         help="Source directory containing PDF files to process"
     )
-    process_parser.add_argument(
+    parser.add_argument(
         "--output-dir",
         help="Optional custom output directory for text files",
         default=None
     )
-    process_parser.add_argument(
+    parser.add_argument(
         "--file",
         help="Process only a specific file",
         default=None
     )
-    process_parser.add_argument(
+    parser.add_argument(
+        "--jobs",
+        help="PDFs processed in parallel (default: half the CPU cores)",
+        type=int,
+        default=None
+    )
+    parser.add_argument(
+        "--force",
+        help="Process every PDF again, even those already processed by a previous run",
+        action="store_true"
+    )
+    parser.add_argument(
+        "--ndjson",
+        help="Write each file's result to stdout as one JSON line as soon as it is done "
+             "(progress and summary go to stderr)",
+        action="store_true"
+    )
+    parser.add_argument(
         "--summary",
         help="Print summary after processing",
         action="store_true"
     )
-    
-    # Enhance PDFs with OCRmyPDF command
-    enhance_parser = subparsers.add_parser("enhance", help="Enhance scanned PDFs with OCRmyPDF")
-    enhance_parser.add_argument(
+
+
+def add_enhance_arguments(parser: argparse.ArgumentParser):
+    """Arguments of the enhance command."""
+    parser.add_argument(
         "source",
         help="Source: directory with PDFs or single PDF file"
     )
-    enhance_parser.add_argument(
+    parser.add_argument(
         "--output-dir",
         help="Output directory for enhanced PDFs (default: ocr_processed)",
         default="ocr_processed"
     )
-    enhance_parser.add_argument(
+    parser.add_argument(
         "--output-subdir",
         help="Optional subdirectory for organized output (e.g., 2020)",
         default=None
     )
-    enhance_parser.add_argument(
+    parser.add_argument(
         "--language",
         help="Language for OCR (default: spa for Spanish)",
         default="spa"
     )
-    enhance_parser.add_argument(
+    parser.add_argument(
+        "--workers",
+        help="PDFs enhanced at the same time (default: one per core for PDFs under 10 pages, square root of CPU cores for longer ones)",
+        type=int,
+        default=None
+    )
+    parser.add_argument(
+        "--jobs",
+        help="Cores used by each ocrmypdf run (default: 1 for PDFs under 10 pages, square root of CPU cores for longer ones)",
+        type=int,
+        default=None
+    )
+    parser.add_argument(
+        "--fast",
+        help="Throughput preset: skip pages that already have text, LSTM-only Tesseract (--tesseract-oem 1) and no output optimization",
+        action="store_true"
+    )
+    parser.add_argument(
+        "--chunk-size",
+        help="PDFs listed and processed at a time, to bound memory on huge directories (default: 1024)",
+        type=int,
+        default=1024
+    )
+    parser.add_argument(
+        "--force",
+        help="Process every PDF again, even those already processed by a previous run",
+        action="store_true"
+    )
+    parser.add_argument(
         "--summary",
         help="Print summary after processing",
         action="store_true"
     )
-    
-    # Webhook command - send PDFs to n8n
-    webhook_parser = subparsers.add_parser("webhook", help="Send PDFs to n8n webhook")
-    webhook_parser.add_argument(
+
+
+def add_webhook_arguments(parser: argparse.ArgumentParser):
+    """Arguments of the webhook command."""
+    parser.add_argument(
         "source",
         nargs="?",
         default=None,
         help="Source: directory, file, or year (e.g., 2024). If empty, sends all years."
     )
-    webhook_parser.add_argument(
+    parser.add_argument(
         "--url",
         help="Custom webhook URL (uses default if not provided)",
         default=None
     )
-    webhook_parser.add_argument(
+    parser.add_argument(
         "--recursive",
         help="Search subdirectories when source is a directory",
         action="store_true"
     )
-    webhook_parser.add_argument(
+    parser.add_argument(
         "--delay",
         help="Delay between files in seconds (default: 1.0)",
         type=float,
         default=1.0
     )
+    parser.add_argument(
+        "--concurrency",
+        help="Requests in flight at the same time (default: 1, sequential with --delay)",
+        type=int,
+        default=1
+    )
+    parser.add_argument(
+        "--rate",
+        help="Maximum requests started per second when --concurrency > 1 (default: unlimited)",
+        type=float,
+        default=None
+    )
+    parser.add_argument(
+        "--batch-size",
+        help="PDFs sent per request as file_0..file_N-1 (default: 1; no delay between batches)",
+        type=int,
+        default=1
+    )
+
+
+# Subcommands: name -> (help, function adding its arguments)
+COMMANDS = {
+    "ocr": ("Process PDFs to extract text", add_ocr_arguments),
+    "parse": ("Parse OCR text files to JSON", add_parse_arguments),
+    "process": ("OCR + Parse in one step", add_process_arguments),
+    "enhance": ("Enhance scanned PDFs with OCRmyPDF", add_enhance_arguments),
+    "webhook": ("Send PDFs to n8n webhook", add_webhook_arguments),
+}
+
+
+@lru_cache(maxsize=1)
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Build the full command line parser with every subcommand (once per process).
+    Only needed for the top-level help and for unknown commands; see
+    build_command_parser() for the usual path.
+    """
+    parser = argparse.ArgumentParser(
+        description="OCR Batch Processor - Process PDF files from a directory"
+    )
+    subparsers = parser.add_subparsers(dest="command", help="Command to execute")
+    for command, (help_text, add_arguments) in COMMANDS.items():
+        add_arguments(subparsers.add_parser(command, help=help_text))
     
-    args = parser.parse_args()
-    
-    if not args.command:
-        parser.print_help()
-        sys.exit(0)
-    
-    # Handle OCR command
-    if args.command == "ocr":
-        handle_ocr_command(args)
+    return parser
+
+
+@lru_cache(maxsize=None)
+def build_command_parser(command: str) -> argparse.ArgumentParser:
+    """
+    Build the parser of a single subcommand, skipping the construction of
+    the other four (the CLI is often launched once per file).
+    """
+    help_text, add_arguments = COMMANDS[command]
+    parser = argparse.ArgumentParser(
+        prog=f"{os.path.basename(sys.argv[0])} {command}",
+        description=help_text
+    )
+    add_arguments(parser)
+    return parser
+
+
+def parse_command_line(argv: Sequence[str]) -> argparse.Namespace:
+    """
+    Parse argv, building only the parser of the requested subcommand.
+    Anything else (no command, -h/--help, unknown command) goes through the full parser.
+    """
+    if argv and argv[0] in COMMANDS:
+        args = build_command_parser(argv[0]).parse_args(argv[1:])
+        args.command = argv[0]
+        return args
     
-    # Handle Parse command
-    elif args.command == "parse":
-        handle_parse_command(args)
+    return build_parser().parse_args(argv)
+
+def main():
+    buffer_stdout()
     
-    # Handle Process (OCR + Parse) command
-    elif args.command == "process":
-        handle_process_command(args)
+    args = parse_command_line(sys.argv[1:])
     
-    # Handle Enhance (OCRmyPDF) command
-    elif args.command == "enhance":
-        handle_enhance_command(args)
+    if not args.command:
+        build_parser().print_help()
+        sys.exit(0)
     
-    # Handle Webhook command
-    elif args.command == "webhook":
-        handle_webhook_command(args)
+    HANDLERS[args.command](args)
 
 
 def handle_webhook_command(args):
     """Handle webhook sending command."""
-    service = WebhookSenderService(args.url)
+    from services.webhook_sender import WebhookSenderService
     
-    if args.source is None:
-        # Send all years
-        print("\n📤 Sending all years to webhook...")
-        result = service.send_all_years()
-    elif args.source.isdigit() and len(args.source) == 4:
-        # Source is a year
-        print(f"\n📤 Sending year {args.source} to webhook...")
-        result = service.send_year(args.source)
-    elif Path(args.source).is_file():
-        # Source is a single file
-        print(f"\n📤 Sending file to webhook...")
-        result = service.send_pdf(args.source)
-        print(json.dumps(result, indent=2))
-        return
-    elif Path(args.source).is_dir():
-        # Source is a directory
-        print(f"\n📤 Sending directory to webhook...")
-        result = service.send_directory(args.source, recursive=args.recursive, delay_between=args.delay)
-    else:
-        # Try as relative path
-        source_path = resolve_path(args.source)
-        if source_path.exists():
-            if source_path.is_file():
-                result = service.send_pdf(str(source_path))
-            else:
-                result = service.send_directory(str(source_path), recursive=args.recursive, delay_between=args.delay)
+    with WebhookSenderService(args.url) as service:
+        if args.source is None:
+            # Send all years
+            print("\n📤 Sending all years to webhook...")
+            result = service.send_all_years(
+                batch_size=args.batch_size,
+                concurrency=args.concurrency,
+                rate=args.rate
+            )
+        elif args.source.isdigit() and len(args.source) == 4:
+            # Source is a year
+            print(f"\n📤 Sending year {args.source} to webhook...")
+            result = service.send_year(
+                args.source,
+                batch_size=args.batch_size,
+                concurrency=args.concurrency,
+                rate=args.rate
+            )
         else:
-            print(f"Error: Source not found: {args.source}")
-            sys.exit(1)
+            source_kind = stat_path(args.source).kind
+            if source_kind == "file":
+                # Source is a single file
+                print(f"\n📤 Sending file to webhook...")
+                result = service.send_pdf(args.source)
+                emit_json(result)
+                return
+            elif source_kind == "dir":
+                # Source is a directory
+                print(f"\n📤 Sending directory to webhook...")
+                result = service.send_directory(
+                    args.source,
+                    recursive=args.recursive,
+                    delay_between=args.delay,
+                    batch_size=args.batch_size,
+                    concurrency=args.concurrency,
+                    rate=args.rate
+                )
+            else:
+                print(f"Error: Source not found: {args.source}")
+                sys.exit(1)
     
     if not result.get("success"):
         sys.exit(1)
 
 
-def handle_ocr_command(args):
-    """Handle OCR processing command."""
-    # Resolve source directory path
-    source_path = resolve_path(args.source_dir)
+def run_ocr_command(
+    args,
+    label: str,
+    process_file: Callable,
+    process_directory: Callable,
+    log=None,
+    json_output: bool = False
+):
+    """
+    Shared body of the ocr and process commands: validate the source directory,
+    create the OCRProcessor (--output-dir) and print the run header, then process
+    --file with process_file(processor, filename), printed as JSON, or the whole
+    directory with process_directory(processor). Exits with an error message if
+    processing fails.
     
-    # Validate source directory
-    if not source_path.exists():
-        print(f"Error: Directory not found: {args.source_dir}")
-        print(f"Resolved path: {source_path}")
-        print(f"Current working directory: {Path.cwd()}")
-        sys.exit(1)
+    Args:
+        args: Parsed command arguments
+        label: Name of the run in the header (e.g. "OCR + PARSE")
+        process_file: Processes a single PDF and returns its result dataclass
+        process_directory: Processes the source directory and prints its summary
+        log: Stream for the progress messages (default: stdout)
+        json_output: Also show the JSON output directory in the header
+    """
+    from services.ocr_processor import OCRProcessor
     
-    if not source_path.is_dir():
-        print(f"Error: Path is not a directory: {source_path}")
-        sys.exit(1)
+    source_path = stat_source(args.source_dir, require_dir=True).path
+    log = log or sys.stdout
     
     try:
         # Resolve output directory if provided
@@ -234,35 +498,19 @@ def handle_ocr_command(args):
         # Initialize processor
         processor = OCRProcessor(str(source_path), output_dir)
         
-        print(f"Starting OCR processing...")
-        print(f"Source: {source_path}")
-        print(f"Output directory will be: {processor._get_output_directory()}\n")
+        print(f"Starting {label} processing...", file=log)
+        print(f"Source: {source_path}", file=log)
+        print(f"Text output: {processor._get_output_directory()}", file=log)
+        if json_output:
+            print(f"JSON output: invoices_json/{processor._extract_year_from_path()}", file=log)
+        print(file=log)
         
         # Process files
         if args.file:
-            # Process single file
-            print(f"Processing single file: {args.file}\n")
-            result = processor.process_single_file(args.file)
-            print(json.dumps(result, indent=2))
+            print(f"Processing single file: {args.file}\n", file=log)
+            emit_json(asdict(process_file(processor, args.file)))
         else:
-            # Process entire directory
-            print(f"Processing all PDF files in directory...\n")
-            results = processor.process_directory()
-            
-            if args.summary:
-                summary = processor.get_summary(results)
-                print(f"\n{'='*50}")
-                print("PROCESSING SUMMARY")
-                print(f"{'='*50}")
-                print(f"Total files processed: {summary['total_processed']}")
-                print(f"Successful: {summary['successful']}")
-                print(f"Failed: {summary['failed']}")
-                print(f"Output directory: {summary['output_directory']}")
-                
-                if summary['failed_files']:
-                    print(f"\nFailed files:")
-                    for filename in summary['failed_files']:
-                        print(f"  - {filename}")
+            process_directory(processor)
         
     except FileNotFoundError as e:
         print(f"Error: {e}")
@@ -272,63 +520,152 @@ def handle_ocr_command(args):
         sys.exit(1)
 
 
+def print_processing_summary(
+    title: str,
+    banner: str,
+    total: int,
+    successful: int,
+    skipped: int,
+    output_lines: Sequence[str],
+    failed_lines: Sequence[str],
+    file=None
+):
+    """Write the summary of an ocr or process run (see print_summary)."""
+    print_summary(title, banner, [
+        f"Total files processed: {total}",
+        f"Successful: {successful}",
+        f"Failed: {len(failed_lines)}",
+        f"Skipped (already processed): {skipped}",
+        *output_lines,
+    ], failed_lines, file=file)
+
+
+def handle_ocr_command(args):
+    """Handle OCR processing command."""
+    def process_directory(processor):
+        print(f"Processing all PDF files in directory...\n")
+        results = processor.process_directory(jobs=args.jobs, force=args.force)
+        
+        if args.summary:
+            summary = processor.get_summary(results)
+            print_processing_summary(
+                "PROCESSING SUMMARY", BANNER_50,
+                summary['total_processed'], summary['successful'], summary['skipped'],
+                [f"Output directory: {summary['output_directory']}"],
+                [f"  - {filename}" for filename in summary['failed_files']]
+            )
+    
+    run_ocr_command(
+        args, "OCR",
+        lambda processor, filename: processor.process_single_file(filename),
+        process_directory
+    )
+
+
 def handle_parse_command(args):
     """Handle data parsing command."""
-    source_path = resolve_path(args.source)
+    from services.data_parser import DataParserService
+    from services.parse_cache import ParseCache
     
-    if not source_path.exists():
-        print(f"Error: Path not found: {args.source}")
-        sys.exit(1)
+    source = stat_source(args.source)
+    source_path, is_dir = source.path, source.is_dir
     
     try:
         parser_service = DataParserService()
         
-        if source_path.is_file() and source_path.suffix == ".txt":
+        if not is_dir and source_path.suffix == ".txt":
             # Parse single file
             print(f"Parsing single text file: {source_path.name}\n")
             result = parser_service.parse_txt_file(source_path, args.output_subdir)
             
-            if result["status"] == "success":
+            if result.status == "success":
                 print(f"✓ Successfully parsed")
-                print(f"  Input:  {result['source_file']}")
-                print(f"  Output: {result['output_file']}")
+                print(f"  Input:  {result.source_file}")
+                print(f"  Output: {result.output_file}")
                 print(f"\nExtracted data:")
-                print(json.dumps(result['data'], indent=2, ensure_ascii=False))
+                emit_json(result.data)
             else:
-                print(f"✗ Error: {result['message']}")
+                print(f"✗ Error: {result.message}")
         
-        elif source_path.is_dir():
+        elif is_dir:
             # Parse all text files in directory
             print(f"Parsing all .txt files in: {source_path}\n")
-            txt_files = sorted(source_path.glob("*.txt"))
+            # Largest files first, so a big one never starts last and holds up the pool
+            with os.scandir(source_path) as entries:
+                sized_files = sorted(
+                    (-entry.stat().st_size, entry.path) for entry in entries
+                    if entry.name.endswith(".txt") and entry.is_file()
+                )
+            txt_files = [path for _, path in sized_files]
             
             if not txt_files:
                 print(f"No .txt files found in {source_path}")
                 return
             
-            results = []
+            # Files whose content is unchanged since the last run reuse their JSON
+            cache = None if args.no_cache else ParseCache(parser_service.output_base_dir)
+            cached_results = {}
+            fingerprints = {}
+            pending_files = []
             for txt_file in txt_files:
-                result = parser_service.parse_txt_file(txt_file, args.output_subdir)
-                results.append(result)
-                
-                status = "✓" if result["status"] == "success" else "✗"
-                print(f"{status} {txt_file.name}")
+                if cache is not None:
+                    fingerprints[txt_file] = cache.fingerprint(txt_file)
+                    result = cache.lookup(
+                        txt_file,
+                        fingerprints[txt_file],
+                        parser_service.get_output_path(txt_file, args.output_subdir)
+                    )
+                    if result is not None:
+                        cached_results[txt_file] = result
+                        continue
+                pending_files.append(txt_file)
+            
+            # Files are independent: parse them in a pool of processes
+            results = []
+            parse_file = partial(
+                parser_service.parse_txt_file, output_subdir=args.output_subdir, return_data=False
+            )
+            # About 4 batches per worker amortizes the IPC without starving the pool
+            jobs = args.jobs or os.cpu_count() or 1
+            chunksize = max(1, len(pending_files) // (4 * jobs))
+            # Progress lines are written and flushed 64 at a time: a single write
+            # call per batch, even on a line-buffered terminal
+            progress = []
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                parsed = executor.map(parse_file, pending_files, chunksize=chunksize)
+                for txt_file in txt_files:
+                    result = cached_results.pop(txt_file, None) or next(parsed)
+                    results.append(result)
+                    if cache is not None and result.status == "success" and not result.cached:
+                        cache.store(txt_file, fingerprints[txt_file], result.output_file)
+                    
+                    status = "✓" if result.status == "success" else "✗"
+                    progress.append(f"{status} {os.path.basename(txt_file)}{' (cached)' if result.cached else ''}\n")
+                    if len(progress) == PROGRESS_BATCH:
+                        sys.stdout.write("".join(progress))
+                        sys.stdout.flush()
+                        progress.clear()
+            sys.stdout.write("".join(progress))
             
-            # Summary
-            successful = [r for r in results if r["status"] == "success"]
-            failed = [r for r in results if r["status"] == "error"]
+            if cache is not None:
+                cache.save()
             
-            print(f"\n{'='*50}")
-            print("PARSING SUMMARY")
-            print(f"{'='*50}")
-            print(f"Total files processed: {len(results)}")
-            print(f"Successful: {len(successful)}")
-            print(f"Failed: {len(failed)}")
+            # Summary (single pass: successes are only counted)
+            successful_count = cached_count = 0
+            failed = []
+            for r in results:
+                if r.status == "success":
+                    successful_count += 1
+                    cached_count += r.cached
+                else:
+                    failed.append(r)
             
-            if failed:
-                print(f"\nFailed files:")
-                for result in failed:
-                    print(f"  - {Path(result.get('source_file', 'unknown')).name}: {result.get('message')}")
+            print_summary("PARSING SUMMARY", BANNER_50, [
+                f"Total files processed: {len(results)}",
+                f"Successful: {successful_count}",
+                f"Failed: {len(failed)}",
+                f"Reused from cache: {cached_count}",
+            ], [f"  - {Path(r.source_file or 'unknown').name}: {r.message}" for r in failed])
         
         else:
             print(f"Error: Path must be a .txt file or directory")
@@ -341,86 +678,75 @@ def handle_parse_command(args):
 
 def handle_process_command(args):
     """Handle combined OCR + Parse command."""
-    # Resolve source directory path
-    source_path = resolve_path(args.source_dir)
-    
-    # Validate source directory
-    if not source_path.exists():
-        print(f"Error: Directory not found: {args.source_dir}")
-        print(f"Resolved path: {source_path}")
-        print(f"Current working directory: {Path.cwd()}")
-        sys.exit(1)
+    # With --ndjson, stdout only carries the JSON lines
+    log = sys.stderr if args.ndjson else sys.stdout
     
-    if not source_path.is_dir():
-        print(f"Error: Path is not a directory: {source_path}")
-        sys.exit(1)
-    
-    try:
-        # Resolve output directory if provided
-        output_dir = None
-        if args.output_dir:
-            output_dir = str(resolve_path(args.output_dir))
-        
-        # Initialize processor
-        processor = OCRProcessor(str(source_path), output_dir)
-        
-        print(f"Starting OCR + PARSE processing...")
-        print(f"Source: {source_path}")
-        print(f"Text output: {processor._get_output_directory()}")
-        print(f"JSON output: invoices_json/{processor._extract_year_from_path()}\n")
-        
-        # Process files
-        if args.file:
-            # Process single file
-            print(f"Processing single file: {args.file}\n")
-            result = processor.process_single_file_with_parsing(args.file)
-            print(json.dumps(result, indent=2, ensure_ascii=False, default=str))
+    def process_directory(processor):
+        if args.ndjson:
+            # Stream one JSON line per file; the summary only keeps counters
+            from services.data_parser import dumps_json
+            
+            counts = {"total": 0, "successful": 0}
+            failed_lines = []
+            
+            def write_result(result):
+                counts["total"] += 1
+                if result.status == "success":
+                    counts["successful"] += 1
+                else:
+                    failed_lines.append(f"  - {result.filename}: {result.message or 'Unknown error'}")
+                sys.stdout.buffer.write(dumps_json(asdict(result), pretty=False, default=str) + b"\n")
+                sys.stdout.buffer.flush()
+            
+            results = processor.process_directory_with_parsing(
+                jobs=args.jobs, force=args.force, on_result=write_result
+            )
+            total, successful = counts["total"], counts["successful"]
         else:
-            # Process entire directory
             print(f"Processing all PDF files in directory...\n")
-            results = processor.process_directory_with_parsing()
+            results = processor.process_directory_with_parsing(jobs=args.jobs, force=args.force)
             
-            if args.summary:
-                # Calculate summary
-                result_list = results.get("results", [])
-                successful = [r for r in result_list if r["status"] == "success"]
-                failed = [r for r in result_list if r["status"] == "error"]
-                
-                print(f"\n{'='*60}")
-                print("PROCESSING SUMMARY (OCR + PARSE)")
-                print(f"{'='*60}")
-                print(f"Total files processed: {len(result_list)}")
-                print(f"Successful: {len(successful)}")
-                print(f"Failed: {len(failed)}")
-                print(f"Text output directory: {results.get('output_directory')}")
-                print(f"JSON output directory: {results.get('json_output_directory')}")
-                
-                if failed:
-                    print(f"\nFailed files:")
-                    for result in failed:
-                        print(f"  - {result['filename']}: {result.get('message', 'Unknown error')}")
+            result_list = results.get("results", [])
+            total = len(result_list)
+            successful = sum(r.status == "success" for r in result_list)
+            failed_lines = [
+                f"  - {r.filename}: {r.message or 'Unknown error'}"
+                for r in result_list if r.status != "success"
+            ]
+        
+        if args.summary:
+            print_processing_summary(
+                "PROCESSING SUMMARY (OCR + PARSE)", BANNER_60,
+                total, successful, results.get('skipped_files', 0),
+                [
+                    f"Text output directory: {results.get('output_directory')}",
+                    f"JSON output directory: {results.get('json_output_directory')}",
+                ],
+                failed_lines,
+                file=log
+            )
     
-    except FileNotFoundError as e:
-        print(f"Error: {e}")
-        sys.exit(1)
-    except Exception as e:
-        print(f"Error during processing: {e}")
-        sys.exit(1)
+    run_ocr_command(
+        args, "OCR + PARSE",
+        lambda processor, filename: processor.process_single_file_with_parsing(filename),
+        process_directory,
+        log,
+        json_output=True
+    )
 
 
 def handle_enhance_command(args):
     """Handle OCRmyPDF enhancement command."""
-    source_path = resolve_path(args.source)
+    from services.ocrmypdf_processor import OCRmyPDFService
     
-    if not source_path.exists():
-        print(f"Error: Path not found: {args.source}")
-        sys.exit(1)
+    source = stat_source(args.source)
+    source_path, is_dir = source.path, source.is_dir
     
     try:
         # Initialize OCRmyPDF service
-        service = OCRmyPDFService(output_dir=args.output_dir)
+        service = OCRmyPDFService(output_dir=args.output_dir, fast=args.fast)
         
-        if source_path.is_file() and source_path.suffix.lower() == ".pdf":
+        if not is_dir and source_path.suffix.lower() == ".pdf":
             # Process single file
             print(f"Enhancing PDF: {source_path.name}")
             print(f"Language: {args.language}")
@@ -432,16 +758,16 @@ def handle_enhance_command(args):
                 args.language
             )
             
-            if result["status"] == "success":
+            if result.status == "success":
                 print(f"✓ Successfully enhanced")
                 print(f"  Input:  {source_path}")
-                print(f"  Output: {result['output_path']}")
-                print(f"  Size:   {result['file_size_kb']} KB")
+                print(f"  Output: {result.output_path}")
+                print(f"  Size:   {result.file_size_kb} KB")
             else:
-                print(f"✗ Error: {result['message']}")
+                print(f"✗ Error: {result.message}")
                 sys.exit(1)
         
-        elif source_path.is_dir():
+        elif is_dir:
             # Process all PDFs in directory
             print(f"Enhancing all PDFs in: {source_path}")
             print(f"Language: {args.language}")
@@ -449,28 +775,29 @@ def handle_enhance_command(args):
             if args.output_subdir:
                 print(f"Output subdirectory: {args.output_subdir}\n")
             
-            results = service.enhance_directory(
-                str(source_path),
-                args.output_subdir,
-                args.language
-            )
+            # Keep OCRmyPDF loaded across all the files of the directory
+            with service:
+                results = service.enhance_directory(
+                    str(source_path),
+                    args.output_subdir,
+                    args.language,
+                    workers=args.workers,
+                    jobs=args.jobs,
+                    force=args.force,
+                    chunk_size=args.chunk_size
+                )
             
             if args.summary:
                 summary = service.processor.get_summary(results)
                 
-                print(f"\n{'='*60}")
-                print("ENHANCEMENT SUMMARY (OCRmyPDF)")
-                print(f"{'='*60}")
-                print(f"Total files processed: {summary['total_processed']}")
-                print(f"Successful: {summary['successful']}")
-                print(f"Failed: {summary['failed']}")
-                print(f"Total size: {summary['total_size_kb']} KB")
-                print(f"Output directory: {summary['output_directory']}")
-                
-                if summary['failed_files']:
-                    print(f"\nFailed files:")
-                    for filename in summary['failed_files']:
-                        print(f"  - {filename}")
+                print_summary("ENHANCEMENT SUMMARY (OCRmyPDF)", BANNER_60, [
+                    f"Total files processed: {summary['total_processed']}",
+                    f"Successful: {summary['successful']}",
+                    f"Failed: {summary['failed']}",
+                    f"Skipped (already processed): {summary['skipped']}",
+                    f"Total size: {summary['total_size_kb']} KB",
+                    f"Output directory: {summary['output_directory']}",
+                ], [f"  - {filename}" for filename in summary['failed_files']])
                 
                 if summary['failed'] > 0:
                     sys.exit(1)
@@ -488,10 +815,21 @@ def handle_enhance_command(args):
         sys.exit(1)
     except Exception as e:
         print(f"Error during enhancement: {e}")
-        import traceback
-        traceback.print_exc()
+        if os.environ.get("SPACEFOOD_DEBUG"):
+            import traceback
+            traceback.print_exc()
         sys.exit(1)
 
 
+# Command name -> handler
+HANDLERS = {
+    "ocr": handle_ocr_command,
+    "parse": handle_parse_command,
+    "process": handle_process_command,
+    "enhance": handle_enhance_command,
+    "webhook": handle_webhook_command,
+}
+
+
 if __name__ == "__main__":
     main()
@@ -2,6 +2,7 @@
 Standalone script for enhancing scanned PDFs with OCRmyPDF.
 Adds a searchable text layer to PDF images, making them OCR-friendly.
 """
+import os
 import sys
 import argparse
 from pathlib import Path
@@ -66,13 +67,13 @@ def main():
                 args.language
             )
             
-            if result["status"] == "success":
+            if result.status == "success":
                 print(f"✓ Successfully processed")
                 print(f"  Input:  {source_path}")
-                print(f"  Output: {result['output_path']}")
-                print(f"  Size:   {result['file_size_kb']} KB")
+                print(f"  Output: {result.output_path}")
+                print(f"  Size:   {result.file_size_kb} KB")
             else:
-                print(f"✗ Error: {result['message']}")
+                print(f"✗ Error: {result.message}")
                 sys.exit(1)
         
         elif source_path.is_dir():
@@ -123,8 +124,9 @@ def main():
         sys.exit(1)
     except Exception as e:
         print(f"Error during processing: {e}")
-        import traceback
-        traceback.print_exc()
+        if os.environ.get("SPACEFOOD_DEBUG"):
+            import traceback
+            traceback.print_exc()
         sys.exit(1)
 
 
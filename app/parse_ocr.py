@@ -2,10 +2,13 @@
 Standalone utility script for parsing OCR text files to JSON.
 Useful for parsing existing .txt files without re-processing PDFs.
 """
+import os
 import sys
 import argparse
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
-from services.data_parser import DataParserService
+from services.data_parser import DataParserService, dumps_json
 
 
 def main():
@@ -30,6 +33,13 @@ def main():
         default=None
     )
     
+    parser.add_argument(
+        "--jobs",
+        help="Number of processes parsing in parallel (default: CPU cores)",
+        type=int,
+        default=None
+    )
+    
     args = parser.parse_args()
     
     source_path = Path(args.source)
@@ -48,21 +58,25 @@ def main():
             print(f"Parsing OCR text file: {source_path.name}\n")
             result = parser_service.parse_txt_file(source_path, args.output_subdir)
             
-            if result["status"] == "success":
+            if result.status == "success":
                 print(f"✓ Successfully parsed")
-                print(f"  Input:  {result['source_file']}")
-                print(f"  Output: {result['output_file']}")
+                print(f"  Input:  {result.source_file}")
+                print(f"  Output: {result.output_file}")
                 print(f"\nExtracted data (JSON):")
-                import json
-                print(json.dumps(result['data'], indent=2, ensure_ascii=False))
+                sys.stdout.flush()
+                sys.stdout.buffer.write(dumps_json(result.data) + b"\n")
             else:
-                print(f"✗ Error: {result['message']}")
+                print(f"✗ Error: {result.message}")
                 sys.exit(1)
         
         elif source_path.is_dir():
             # Parse all text files in directory
             print(f"Parsing all .txt files in: {source_path}\n")
-            txt_files = sorted(source_path.glob("*.txt"))
+            with os.scandir(source_path) as entries:
+                txt_files = sorted(
+                    entry.path for entry in entries
+                    if entry.name.endswith(".txt") and entry.is_file()
+                )
             
             if not txt_files:
                 print(f"No .txt files found in {source_path}")
@@ -70,18 +84,26 @@ def main():
             
             print(f"Found {len(txt_files)} .txt files to process...\n")
             
+            # Files are independent: parse them in a pool of processes,
+            # handing each worker about 4 batches to amortize the IPC
+            jobs = args.jobs or os.cpu_count() or 1
+            chunksize = max(1, len(txt_files) // (4 * jobs))
             results = []
-            for txt_file in txt_files:
-                result = parser_service.parse_txt_file(txt_file, args.output_subdir)
-                results.append(result)
-                
-                status = "✓" if result["status"] == "success" else "✗"
-                output_name = Path(result.get('output_file', '')).name if result.get('output_file') else 'error'
-                print(f"{status} {txt_file.name:<30} -> {output_name}")
+            parse_file = partial(
+                parser_service.parse_txt_file, output_subdir=args.output_subdir, return_data=False
+            )
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                parsed = executor.map(parse_file, txt_files, chunksize=chunksize)
+                for txt_file, result in zip(txt_files, parsed):
+                    results.append(result)
+                    
+                    status = "✓" if result.status == "success" else "✗"
+                    output_name = Path(result.output_file).name if result.output_file else 'error'
+                    print(f"{status} {os.path.basename(txt_file):<30} -> {output_name}")
             
             # Summary
-            successful = [r for r in results if r["status"] == "success"]
-            failed = [r for r in results if r["status"] == "error"]
+            successful = [r for r in results if r.status == "success"]
+            failed = [r for r in results if r.status == "error"]
             
             print(f"\n{'='*60}")
             print("PARSING SUMMARY")
@@ -96,8 +118,8 @@ def main():
             if failed:
                 print(f"\nFailed files:")
                 for result in failed:
-                    source_name = Path(result.get('source_file', 'unknown')).name
-                    print(f"  - {source_name}: {result.get('message')}")
+                    source_name = Path(result.source_file or 'unknown').name
+                    print(f"  - {source_name}: {result.message}")
             
             if failed:
                 sys.exit(1)
@@ -108,8 +130,9 @@ def main():
     
     except Exception as e:
         print(f"Error during parsing: {e}")
-        import traceback
-        traceback.print_exc()
+        if os.environ.get("SPACEFOOD_DEBUG"):
+            import traceback
+            traceback.print_exc()
         sys.exit(1)
 
 
@@ -2,12 +2,18 @@
 Pipeline orchestrator - Ejecuta flujos de trabajo completos de OCR.
 Combina los tres servicios en pipelines predefinidos.
 """
+import multiprocessing
+import os
 import sys
-from pathlib import Path
-from services.ocrmypdf_processor import OCRmyPDFService
-from services.ocr_processor import OCRProcessor
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from services.ocrmypdf_processor import OCRmyPDFService, default_parallelism
+from services.ocr_processor import OCRProcessor, create_ocr_pool
 from services.data_parser import DataParserService
 
+# Líneas de progreso del parseo que se escriben juntas en una sola llamada
+PROGRESS_BATCH = 64
+
 
 class OCRPipeline:
     """Orquestador de pipeline completo de OCR."""
@@ -57,14 +63,94 @@ class OCRPipeline:
         print(f"Entrada:  Archivos .txt en {source_dir}")
         print(f"Salida:   Archivos .json en invoices_json/\n")
         
-        txt_files = sorted(Path(source_dir).glob("*.txt"))
+        with os.scandir(source_dir) as entries:
+            txt_files = sorted(
+                entry.path for entry in entries
+                if entry.name.endswith(".txt") and entry.is_file()
+            )
         results = {"total": len(txt_files), "processed": []}
         
-        for txt_file in txt_files:
-            result = self.parser_service.parse_txt_file(txt_file)
-            results["processed"].append(result)
-            status = "✓" if result["status"] == "success" else "✗"
-            print(f"{status} {txt_file.name}")
+        # El parseo es solo CPU: repartir los archivos en un pool de procesos
+        # (unos 4 lotes por proceso) y mostrarlos en orden de nombre
+        # Los datos ya quedan en el .json: no se devuelven entre procesos
+        jobs = os.cpu_count() or 1
+        chunksize = max(1, len(txt_files) // (4 * jobs))
+        parse_file = partial(self.parser_service.parse_txt_file, return_data=False)
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            parsed = executor.map(parse_file, txt_files, chunksize=chunksize)
+            # El progreso se acumula y se escribe de 64 en 64 líneas: una sola
+            # escritura (y un flush) por lote en lugar de un print por archivo
+            progress = []
+            for txt_file, result in zip(txt_files, parsed):
+                results["processed"].append(result)
+                status = "✓" if result.status == "success" else "✗"
+                progress.append(f"{status} {os.path.basename(txt_file)}\n")
+                if len(progress) == PROGRESS_BATCH:
+                    sys.stdout.write("".join(progress))
+                    sys.stdout.flush()
+                    progress.clear()
+        sys.stdout.write("".join(progress))
+        
+        return results
+    
+    def _enhance_ocr_chain(self, source_dir: str, enhance_output: str, parse: bool) -> dict:
+        """
+        Mejora + OCR (+ parseo) encadenados por archivo: cada PDF pasa al OCR
+        en cuanto termina su mejora, y al parseo en cuanto termina su OCR.
+        Varios PDFs avanzan a la vez, así la mejora de un archivo se solapa
+        con el OCR y el parseo de los anteriores en lugar de esperar a que
+        termine toda la carpeta en cada paso.
+        """
+        with os.scandir(source_dir) as entries:
+            pdf_names = sorted(
+                entry.name for entry in entries
+                if entry.name.endswith(".pdf") and entry.is_file()
+            )
+        
+        self.ocrmypdf_service = OCRmyPDFService(output_dir=enhance_output)
+        processor = OCRProcessor(enhance_output)
+        # Tantos PDFs en curso como workers de OCRmyPDF, cada uno con ese mismo
+        # número de jobs: PDFs x jobs se queda cerca del número de núcleos
+        parallelism = default_parallelism()
+        
+        def run_chain(pdf_name):
+            enhance_result = self.ocrmypdf_service.enhance_pdf(
+                os.path.join(source_dir, pdf_name), language="spa", jobs=parallelism
+            )
+            if enhance_result.status != "success":
+                return enhance_result, None, None
+            # PyMuPDF no admite varios hilos: el OCR va en procesos aparte
+            ocr_result = ocr_pool.submit(processor.process_single_file, pdf_name).result()
+            if not parse or ocr_result.status != "success":
+                return enhance_result, ocr_result, None
+            return enhance_result, ocr_result, self.parser_service.parse_txt_file(ocr_result.output_path)
+        
+        results = {
+            "step_1_enhance": {"total_files": len(pdf_names), "output_directory": enhance_output, "results": []},
+            "step_2_ocr": {"output_directory": str(processor._get_output_directory()), "results": []},
+        }
+        if parse:
+            results["step_3_parse"] = {"total": len(pdf_names), "processed": []}
+        
+        # Los hilos solo esperan a procesos (ocrmypdf, OCR) y limitan cuántos
+        # PDFs hay en curso a la vez. Los procesos de OCR se crean con spawn:
+        # hacer fork de un proceso con hilos en marcha no es seguro
+        with self.ocrmypdf_service, create_ocr_pool(
+            parallelism, multiprocessing.get_context("spawn")
+        ) as ocr_pool, ThreadPoolExecutor(max_workers=parallelism) as executor:
+            for pdf_name, chain in zip(pdf_names, executor.map(run_chain, pdf_names)):
+                enhance_result, ocr_result, parse_result = chain
+                results["step_1_enhance"]["results"].append(enhance_result)
+                if ocr_result is not None:
+                    results["step_2_ocr"]["results"].append(ocr_result)
+                if parse_result is not None:
+                    results["step_3_parse"]["processed"].append(parse_result)
+                
+                failed = next(
+                    (r for r in chain if r is not None and r.status != "success"), None
+                )
+                status = "✗" if failed else "✓"
+                print(f"{status} {pdf_name}{f' - Error: {failed.message}' if failed else ''}")
         
         return results
     
@@ -76,21 +162,10 @@ class OCRPipeline:
         print("=" * 70)
         print("PIPELINE: Mejora + OCR")
         print("=" * 70)
+        print(f"Entrada:  PDFs escaneados en {source_dir}")
+        print(f"Salida:   PDFs mejorados en {enhance_output} y archivos .txt en data_result/\n")
         
-        # Paso 1: Mejora
-        print("\nPASO 1: Mejora de PDFs (OCRmyPDF)")
-        print("-" * 70)
-        enhance_results = self.enhance_only(source_dir, enhance_output)
-        
-        # Paso 2: OCR
-        print("\nPASO 2: Extracción de texto OCR")
-        print("-" * 70)
-        ocr_results = self.ocr_only(enhance_output)
-        
-        return {
-            "step_1_enhance": enhance_results,
-            "step_2_ocr": ocr_results
-        }
+        return self._enhance_ocr_chain(source_dir, enhance_output, parse=False)
     
     def ocr_then_parse(self, source_dir: str, txt_output: str = None) -> dict:
         """
@@ -126,26 +201,8 @@ class OCRPipeline:
         print("=" * 70)
         print("PIPELINE COMPLETO: Mejora + OCR + Parse")
         print("=" * 70)
+        print(f"Entrada:  PDFs escaneados en {source_dir}")
+        print(f"Salida:   PDFs mejorados en {enhance_output}, archivos .txt en data_result/")
+        print(f"          y archivos .json en invoices_json/\n")
         
-        # Paso 1: Mejora
-        print("\nPASO 1: Mejora de PDFs (OCRmyPDF)")
-        print("-" * 70)
-        enhance_results = self.enhance_only(source_dir, enhance_output)
-        
-        # Paso 2: OCR
-        print("\nPASO 2: Extracción de texto OCR")
-        print("-" * 70)
-        ocr_results = self.ocr_only(enhance_output)
-        processor = OCRProcessor(enhance_output)
-        txt_output_dir = processor._get_output_directory()
-        
-        # Paso 3: Parse
-        print("\nPASO 3: Parseo de texto a JSON")
-        print("-" * 70)
-        parse_results = self.parse_only(str(txt_output_dir))
-        
-        return {
-            "step_1_enhance": enhance_results,
-            "step_2_ocr": ocr_results,
-            "step_3_parse": parse_results
-        }
+        return self._enhance_ocr_chain(source_dir, enhance_output, parse=True)
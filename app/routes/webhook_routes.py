@@ -16,8 +16,8 @@ def send_single_pdf(pdf_path: str, webhook_url: str = None) -> dict:
     Returns:
         Result dictionary
     """
-    service = WebhookSenderService(webhook_url)
-    return service.send_pdf(pdf_path)
+    with WebhookSenderService(webhook_url) as service:
+        return service.send_pdf(pdf_path)
 
 
 def send_directory(directory: str, webhook_url: str = None, recursive: bool = False) -> dict:
@@ -32,8 +32,8 @@ def send_directory(directory: str, webhook_url: str = None, recursive: bool = Fa
     Returns:
         Result dictionary
     """
-    service = WebhookSenderService(webhook_url)
-    return service.send_directory(directory, recursive=recursive)
+    with WebhookSenderService(webhook_url) as service:
+        return service.send_directory(directory, recursive=recursive)
 
 
 def send_year(year: str, webhook_url: str = None) -> dict:
@@ -47,8 +47,8 @@ def send_year(year: str, webhook_url: str = None) -> dict:
     Returns:
         Result dictionary
     """
-    service = WebhookSenderService(webhook_url)
-    return service.send_year(year)
+    with WebhookSenderService(webhook_url) as service:
+        return service.send_year(year)
 
 
 def send_all_years(webhook_url: str = None) -> dict:
@@ -61,5 +61,5 @@ def send_all_years(webhook_url: str = None) -> dict:
     Returns:
         Result dictionary
     """
-    service = WebhookSenderService(webhook_url)
-    return service.send_all_years()
+    with WebhookSenderService(webhook_url) as service:
+        return service.send_all_years()
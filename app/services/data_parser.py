@@ -3,16 +3,157 @@ Data Parser Service for extracting structured data from OCR text.
 Converts raw OCR text to JSON format based on predefined schema.
 """
 import json
+import mmap
+import os
 import re
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, List, Any, Iterator, NamedTuple, Optional, Tuple
 import logging
 
+from services.results import ParseResult
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# Text files at least this large are memory-mapped instead of read()
+MMAP_MIN_SIZE = 64 * 1024
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def dumps_json(data: Any, pretty: bool = True, default: Optional[Callable[[Any], Any]] = None) -> bytes:
+    """
+    Serialize data to UTF-8 encoded JSON.
+    Uses orjson when installed (several times faster), stdlib json otherwise.
+
+    Args:
+        data: JSON-serializable object
+        pretty: Whether to indent the output with 2 spaces
+        default: Called for objects JSON cannot encode (e.g. str); None raises TypeError
+
+    Returns:
+        JSON document as bytes
+    """
+    if orjson is not None:
+        # Non-string dict keys are accepted by stdlib json, so allow them here too
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0)
+        return orjson.dumps(data, option=option, default=default)
+    return json.dumps(
+        data, indent=2 if pretty else None, ensure_ascii=False, default=default
+    ).encode("utf-8")
+
+
+# Runs of whitespace collapsed by DataParser._clean_text
+_WS = re.compile(r'\s+')
+
+
+class Keywords(NamedTuple):
+    """A group of lowercase keywords and the scanner that finds them in a text."""
+    words: Tuple[str, ...]
+    scanner: Any
+
+
+def _scanner(words: Tuple[str, ...]) -> Any:
+    """
+    Build a matcher for a set of keywords: an Aho-Corasick automaton when
+    pyahocorasick is installed (one linear pass whatever the number of
+    keywords), a precompiled regex alternation otherwise.
+    """
+    if ahocorasick is not None:
+        automaton = ahocorasick.Automaton()
+        for word in words:
+            automaton.add_word(word, word)
+        automaton.make_automaton()
+        return automaton
+    return re.compile("|".join(re.escape(word) for word in words))
+
+
+def _keywords(*words: str) -> Keywords:
+    """Build a keyword group (compiled once, at import time)."""
+    return Keywords(words, _scanner(words))
+
+
+def _any_keyword(fields: Dict[str, Keywords]) -> Any:
+    """One scanner for every keyword of a field table, to find candidate lines in one scan."""
+    return _keywords(*(word for keywords in fields.values() for word in keywords.words)).scanner
+
+
+# Keywords of each header field; on a matching line they are tried in this order
+HEADER_FIELDS = {
+    "importador_nombre": _keywords("importador", "empresa", "razón social", "razon social"),
+    "importador_domicilio": _keywords("domicilio", "dirección", "direccion", "domicilio del importador"),
+    "importador_rfc": _keywords("rfc", "registro federal", "clave de rfc"),
+    "pedimento": _keywords("pedimento", "número de pedimento", "numero de pedimento", "aduana pedimento"),
+    "fecha_pedimento": _keywords("fecha pedimento", "fecha de pedimento"),
+    "num_factura": _keywords(
+        "factura", "número de factura", "numero de factura", "folio factura", "invoice"
+    ),
+    "fecha_factura": _keywords("fecha factura", "fecha de factura", "fecha emisión"),
+    "lugar_em_factura": _keywords("lugar", "lugar de emisión", "lugar de emision"),
+}
+HEADER_ANY = _any_keyword(HEADER_FIELDS)
+
+# Lines that open the supplier section, and the fields read from it
+PROVEEDOR_SECTION = _keywords("proveedor", "supplier", "vendedor", "exportador")
+PROVEEDOR_FIELDS = {
+    "id_fiscal": _keywords("id fiscal", "idn", "tax id", "rfc"),
+    "nombre": _keywords("nombre", "company", "empresa"),
+    "domicilio": _keywords("domicilio", "dirección", "direccion", "address"),
+}
+PROVEEDOR_ANY = _any_keyword(PROVEEDOR_FIELDS)
+
+# Lines that open the line item section, and the fields read from it
+PARTIDA_SECTION = _keywords("partida", "item", "producto", "descripción")
+PARTIDA_FIELDS = {
+    "partida": _keywords("partida", "item #"),
+    "secuencia": _keywords("secuencia", "sequence"),
+    "valor_aduana": _keywords("valor aduana", "valor", "price"),
+    "fraccion": _keywords("fracción", "fraccion", "tariff"),
+    "descripcion": _keywords("descripción", "descripcion", "description"),
+    "cantidad_umc": _keywords("cantidad", "qty", "umc"),
+    "pais_produccion": _keywords("país producción", "pais produccion", "country of origin"),
+    "pais_procedencia": _keywords("país procedencia", "pais procedencia", "country"),
+    "precio_pagado": _keywords("precio pagado", "paid price"),
+    "precio_unitario": _keywords("precio unitario", "unit price"),
+}
+PARTIDA_ANY = _any_keyword(PARTIDA_FIELDS)
+
+
+def _match_positions(text: str, scanner: Any) -> Iterator[int]:
+    """Yield, in increasing order, a position inside every keyword match."""
+    if ahocorasick is not None:
+        # Automaton matches come as (end index, keyword), sorted by end
+        return (end for end, _ in scanner.iter(text))
+    return (match.start() for match in scanner.finditer(text))
+
+
+def _matching_lines(text: str, scanner: Any) -> Iterator[int]:
+    """
+    Yield, in order, the index of every line of text that contains a match.
+    The whole text is scanned once by the automaton or regex engine instead
+    of testing every keyword against every line in Python.
+    """
+    line_index = 0
+    last_index = -1
+    position = 0
+    for match_position in _match_positions(text, scanner):
+        line_index += text.count('\n', position, match_position)
+        position = match_position
+        if line_index != last_index:
+            last_index = line_index
+            yield line_index
+
+
 class DataParser:
     """
     Parser service that extracts structured data from OCR text.
@@ -46,168 +187,124 @@ class DataParser:
         """
         self.ocr_text = ocr_text.lower()  # Convert to lowercase for easier matching
         self.original_text = ocr_text  # Keep original for reference
+        # Lowercase lines, split once and shared by every extraction
+        self.lines = self.ocr_text.split('\n')
         self.data = {}
 
     @staticmethod
     def _clean_text(text: str) -> str:
         """Clean extracted text by removing extra whitespace."""
-        return re.sub(r'\s+', ' ', text.strip())
+        return _WS.sub(' ', text.strip())
 
-    def _extract_field(self, keywords: List[str], context_lines: int = 2) -> Optional[str]:
+    @staticmethod
+    def _extract_fields(
+        text: str,
+        lines: List[str],
+        fields: Dict[str, Keywords],
+        any_keyword: Any,
+        value_at: Callable[[List[str], int, Keywords], Optional[str]]
+    ) -> Dict[str, str]:
         """
-        Extract a field value by searching for keywords.
+        Extract several fields in a single scan of the text.
+        Lines holding any keyword of the table are found with one scan;
+        each field takes its value from the first of those lines where
+        value_at() finds one.
 
         Args:
-            keywords: List of keywords to search for
-            context_lines: Number of lines after keyword to search for value
+            text: Lowercase text to search
+            lines: text split on newlines
+            fields: Field name -> keyword group
+            any_keyword: Scanner of every keyword of fields
+            value_at: Returns the value of a field at a line (None to keep looking)
 
         Returns:
-            Extracted value or None
+            Field name -> extracted value ("" when not found)
         """
-        lines = self.ocr_text.split('\n')
-
-        for i, line in enumerate(lines):
-            for keyword in keywords:
-                if keyword.lower() in line:
-                    # Try to extract value from the same line or following lines
-                    for j in range(i, min(i + context_lines + 1, len(lines))):
-                        candidate = lines[j].strip()
-                        if candidate and candidate != line.strip():
-                            return self._clean_text(candidate)
-                    # If found keyword, try to extract from after the keyword
-                    value = line.split(keyword.lower())[-1].strip()
-                    if value:
-                        return self._clean_text(value)
-        return ""
-
-    def _extract_importador(self) -> Dict[str, str]:
-        """Extract importer/importador information."""
-        return {
-            "importador_nombre": self._extract_field([
-                "importador", "empresa", "razón social", "razon social"
-            ]),
-            "importador_domicilio": self._extract_field([
-                "domicilio", "dirección", "direccion", "domicilio del importador"
-            ]),
-            "importador_rfc": self._extract_field([
-                "rfc", "registro federal", "clave de rfc"
-            ])
-        }
-
-    def _extract_pedimento(self) -> Dict[str, str]:
-        """Extract pedimento (customs document) information."""
-        return {
-            "pedimento": self._extract_field([
-                "pedimento", "número de pedimento", "numero de pedimento",
-                "aduana pedimento"
-            ]),
-            "fecha_pedimento": self._extract_field([
-                "fecha pedimento", "fecha de pedimento"
-            ])
-        }
-
-    def _extract_factura(self) -> Dict[str, str]:
-        """Extract invoice information."""
-        return {
-            "num_factura": self._extract_field([
-                "factura", "número de factura", "numero de factura",
-                "folio factura", "invoice"
-            ]),
-            "fecha_factura": self._extract_field([
-                "fecha factura", "fecha de factura", "fecha emisión"
-            ]),
-            "lugar_em_factura": self._extract_field([
-                "lugar", "lugar de emisión", "lugar de emision"
-            ])
-        }
+        values = dict.fromkeys(fields, "")
+        pending = dict(fields)
+
+        for i in _matching_lines(text, any_keyword):
+            for name, keywords in list(pending.items()):
+                value = value_at(lines, i, keywords)
+                if value is not None:
+                    values[name] = value
+                    del pending[name]
+            if not pending:
+                break
+        return values
+
+    @classmethod
+    def _header_value_at(cls, lines: List[str], i: int, keywords: Keywords, context_lines: int = 2) -> Optional[str]:
+        """
+        Value of a header field whose keyword is on line i: the next non-empty
+        line within context_lines, otherwise the text after the keyword.
+        """
+        line = lines[i]
+        for keyword in keywords.words:
+            if keyword in line:
+                # Try to extract value from the same line or following lines
+                for j in range(i, min(i + context_lines + 1, len(lines))):
+                    candidate = lines[j].strip()
+                    if candidate and candidate != line.strip():
+                        return cls._clean_text(candidate)
+                # If found keyword, try to extract from after the keyword
+                value = line.split(keyword)[-1].strip()
+                if value:
+                    return cls._clean_text(value)
+        return None
+
+    @classmethod
+    def _section_value_at(cls, lines: List[str], i: int, keywords: Keywords) -> Optional[str]:
+        """
+        Value of a supplier/line item field whose keyword is on line i:
+        the text after the keyword, otherwise the next line.
+        """
+        line = lines[i]
+        for keyword in keywords.words:
+            if keyword in line:
+                value = line.split(keyword)[-1].strip()
+                if value:
+                    return cls._clean_text(value)
+                # Try next line
+                if i + 1 < len(lines):
+                    return cls._clean_text(lines[i + 1].strip())
+        return None
+
+    def _first_line_matching(self, keywords: Keywords) -> Optional[int]:
+        """Index of the first line holding one of the keywords, or None."""
+        return next(_matching_lines(self.ocr_text, keywords.scanner), None)
 
     def _extract_proveedores(self) -> List[Dict[str, str]]:
         """Extract supplier/proveedor information."""
         proveedores = []
 
-        # Search for supplier section
-        supplier_keywords = ["proveedor", "supplier", "vendedor", "exportador"]
-        lines = self.original_text.split('\n')
-
-        supplier_section = []
-        in_supplier_section = False
-
-        for i, line in enumerate(lines):
-            if any(keyword in line.lower() for keyword in supplier_keywords):
-                in_supplier_section = True
-
-            if in_supplier_section:
-                supplier_section.append(line)
-                # End supplier section after collecting enough lines
-                if len(supplier_section) > 10:
-                    break
-
-        supplier_text = '\n'.join(supplier_section).lower()
-
-        proveedor = {
-            "id_fiscal": self._extract_field_from_text(supplier_text, [
-                "id fiscal", "idn", "tax id", "rfc"
-            ]) or "",
-            "nombre": self._extract_field_from_text(supplier_text, [
-                "nombre", "company", "empresa"
-            ]) or "",
-            "domicilio": self._extract_field_from_text(supplier_text, [
-                "domicilio", "dirección", "direccion", "address"
-            ]) or ""
-        }
+        # The supplier section spans the first line naming a supplier and the 10 after it
+        start = self._first_line_matching(PROVEEDOR_SECTION)
+        supplier_lines = self.lines[start:start + 11] if start is not None else []
+
+        proveedor = self._extract_fields(
+            '\n'.join(supplier_lines), supplier_lines,
+            PROVEEDOR_FIELDS, PROVEEDOR_ANY, self._section_value_at
+        )
 
         if any(proveedor.values()):
             proveedores.append(proveedor)
 
         return proveedores
 
-    def _extract_field_from_text(self, text: str, keywords: List[str]) -> Optional[str]:
-        """Helper to extract field from specific text block."""
-        lines = text.split('\n')
-        for i, line in enumerate(lines):
-            for keyword in keywords:
-                if keyword.lower() in line:
-                    value = line.split(keyword.lower())[-1].strip()
-                    if value:
-                        return self._clean_text(value)
-                    # Try next line
-                    if i + 1 < len(lines):
-                        return self._clean_text(lines[i + 1].strip())
-        return ""
-
     def _extract_partidas(self) -> List[Dict[str, str]]:
         """Extract product line items (partidas)."""
         partidas = []
 
-        # Search for partida/item section
-        partida_keywords = ["partida", "item", "producto", "descripción"]
-        lines = self.original_text.split('\n')
-
-        partida_section = []
-        in_partida_section = False
-
-        for i, line in enumerate(lines):
-            if any(keyword in line.lower() for keyword in partida_keywords):
-                in_partida_section = True
-
-            if in_partida_section:
-                partida_section.append(line)
-
-        partida_text = '\n'.join(partida_section).lower()
+        # The partida section runs from the first line naming an item to the end
+        start = self._first_line_matching(PARTIDA_SECTION)
+        partida_lines = self.lines[start:] if start is not None else []
 
         # Try to extract multiple partidas
-        partida = {
-            "partida": self._extract_field_from_text(partida_text, ["partida", "item #"]) or "",
-            "secuencia": self._extract_field_from_text(partida_text, ["secuencia", "sequence"]) or "",
-            "valor_aduana": self._extract_field_from_text(partida_text, ["valor aduana", "valor", "price"]) or "",
-            "fraccion": self._extract_field_from_text(partida_text, ["fracción", "fraccion", "tariff"]) or "",
-            "descripcion": self._extract_field_from_text(partida_text, ["descripción", "descripcion", "description"]) or "",
-            "cantidad_umc": self._extract_field_from_text(partida_text, ["cantidad", "qty", "umc"]) or "",
-            "pais_produccion": self._extract_field_from_text(partida_text, ["país producción", "pais produccion", "country of origin"]) or "",
-            "pais_procedencia": self._extract_field_from_text(partida_text, ["país procedencia", "pais procedencia", "country"]) or "",
-            "precio_pagado": self._extract_field_from_text(partida_text, ["precio pagado", "paid price"]) or "",
-            "precio_unitario": self._extract_field_from_text(partida_text, ["precio unitario", "unit price"]) or ""
-        }
+        partida = self._extract_fields(
+            '\n'.join(partida_lines), partida_lines,
+            PARTIDA_FIELDS, PARTIDA_ANY, self._section_value_at
+        )
 
         if any(partida.values()):
             partidas.append(partida)
@@ -221,24 +318,10 @@ class DataParser:
         Returns:
             Dictionary with extracted data matching the schema
         """
-        result = {}
-
-        # Extract importador
-        importador = self._extract_importador()
-        result["importador_nombre"] = importador.get("importador_nombre", "")
-        result["importador_domicilio"] = importador.get("importador_domicilio", "")
-        result["importador_rfc"] = importador.get("importador_rfc", "")
-
-        # Extract pedimento
-        pedimento = self._extract_pedimento()
-        result["pedimento"] = pedimento.get("pedimento", "")
-        result["fecha_pedimento"] = pedimento.get("fecha_pedimento", "")
-
-        # Extract factura
-        factura = self._extract_factura()
-        result["num_factura"] = factura.get("num_factura", "")
-        result["fecha_factura"] = factura.get("fecha_factura", "")
-        result["lugar_em_factura"] = factura.get("lugar_em_factura", "")
+        # Importador, pedimento and factura fields, in one scan of the text
+        result = self._extract_fields(
+            self.ocr_text, self.lines, HEADER_FIELDS, HEADER_ANY, self._header_value_at
+        )
 
         # Extract proveedores
         result["proveedores"] = self._extract_proveedores()
@@ -262,9 +345,7 @@ class DataParser:
         if not self.data:
             self.parse()
 
-        if pretty:
-            return json.dumps(self.data, indent=2, ensure_ascii=False)
-        return json.dumps(self.data, ensure_ascii=False)
+        return dumps_json(self.data, pretty).decode("utf-8")
 
     @staticmethod
     def from_txt_file(txt_path: Path) -> 'DataParser':
@@ -277,8 +358,22 @@ class DataParser:
         Returns:
             DataParser instance
         """
-        with open(txt_path, 'r', encoding='utf-8') as f:
-            text = f.read()
+        with open(txt_path, 'rb', buffering=0) as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < MMAP_MIN_SIZE:
+                # Small files: a single read() is cheaper than setting up a mapping
+                text = str(f.readall(), 'utf-8')
+            else:
+                if hasattr(os, 'posix_fadvise'):
+                    os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+                # Map the file and decode straight from the page cache,
+                # without an intermediate bytes copy
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    text = str(mm, 'utf-8')
+
+        # Match text-mode reading, which translates \r\n and \r to \n
+        if '\r' in text:
+            text = text.replace('\r\n', '\n').replace('\r', '\n')
         return DataParser(text)
 
 
@@ -294,61 +389,82 @@ class DataParserService:
         """
         self.output_base_dir = Path(output_base_dir)
         self.output_base_dir.mkdir(parents=True, exist_ok=True)
+        # Output directories already created by this instance (each pool worker has its own copy)
+        self._created_dirs = {self.output_base_dir}
+
+    def _ensure_dir(self, directory: Path) -> None:
+        """Create directory once per instance instead of calling mkdir() for every file."""
+        if directory not in self._created_dirs:
+            directory.mkdir(parents=True, exist_ok=True)
+            self._created_dirs.add(directory)
+
+    def get_output_path(self, txt_path: Path, output_subdir: str = None) -> Path:
+        """
+        Return the JSON path parse_txt_file() writes for a text file.
+
+        Args:
+            txt_path: Path to the OCR text file
+            output_subdir: Optional subdirectory for the output
 
-    def parse_txt_file(self, txt_path: Path, output_subdir: str = None) -> Dict[str, str]:
+        Returns:
+            Path of the output JSON file
+        """
+        txt_path = Path(txt_path)
+        if output_subdir:
+            output_dir = self.output_base_dir / output_subdir
+        else:
+            # Extract year from txt_path if possible
+            output_dir = self.output_base_dir / self._extract_year_from_path(str(txt_path.parent))
+        return output_dir / f"{txt_path.stem}.json"
+
+    def parse_txt_file(self, txt_path: Path, output_subdir: str = None, return_data: bool = True) -> ParseResult:
         """
         Parse a text file and save the result as JSON.
 
         Args:
             txt_path: Path to the OCR text file
             output_subdir: Optional subdirectory for the output
+            return_data: Whether to attach the parsed data to the result
+                (pass False from process pools to avoid pickling it back)
 
         Returns:
-            Dictionary with status and file paths
+            ParseResult with status and file paths
         """
+        txt_path = Path(txt_path)
         if not txt_path.exists():
-            return {
-                "status": "error",
-                "message": f"Text file not found: {txt_path}"
-            }
+            return ParseResult(
+                status="error",
+                source_file=str(txt_path),
+                message=f"Text file not found: {txt_path}"
+            )
 
         try:
             # Parse the text file
             parser = DataParser.from_txt_file(txt_path)
             parsed_data = parser.parse()
 
-            # Determine output directory
-            if output_subdir:
-                output_dir = self.output_base_dir / output_subdir
-            else:
-                # Extract year from txt_path if possible
-                year = self._extract_year_from_path(txt_path)
-                output_dir = self.output_base_dir / year
-
-            output_dir.mkdir(parents=True, exist_ok=True)
-
-            # Create output filename
-            filename = txt_path.stem
-            output_path = output_dir / f"{filename}.json"
+            output_path = self.get_output_path(txt_path, output_subdir)
+            self._ensure_dir(output_path.parent)
 
             # Save JSON
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(parser.to_json(pretty=True))
+            with open(output_path, 'wb') as f:
+                f.write(dumps_json(parsed_data))
 
-            return {
-                "status": "success",
-                "source_file": str(txt_path),
-                "output_file": str(output_path),
-                "data": parsed_data
-            }
+            return ParseResult(
+                status="success",
+                source_file=str(txt_path),
+                output_file=str(output_path),
+                data=parsed_data if return_data else None
+            )
 
         except Exception as e:
-            return {
-                "status": "error",
-                "message": f"Error parsing {txt_path.name}: {str(e)}"
-            }
+            return ParseResult(
+                status="error",
+                source_file=str(txt_path),
+                message=f"Error parsing {txt_path.name}: {str(e)}"
+            )
 
-    def parse_from_text(self, text: str, output_filename: str, output_subdir: str = None) -> Dict[str, str]:
+    def parse_from_text(self, text: str, output_filename: str, output_subdir: str = None) -> ParseResult:
         """
         Parse raw OCR text and save the result as JSON.
 
@@ -358,7 +474,7 @@ class DataParserService:
             output_subdir: Optional subdirectory for the output
 
         Returns:
-            Dictionary with status and file paths
+            ParseResult with status and file paths
         """
         try:
             # Parse the text
@@ -371,30 +487,77 @@ class DataParserService:
             else:
                 output_dir = self.output_base_dir
 
-            output_dir.mkdir(parents=True, exist_ok=True)
+            self._ensure_dir(output_dir)
 
             # Save JSON
             output_path = output_dir / f"{output_filename}.json"
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(parser.to_json(pretty=True))
+            with open(output_path, 'wb') as f:
+                f.write(dumps_json(parsed_data))
 
-            return {
-                "status": "success",
-                "output_file": str(output_path),
-                "data": parsed_data
-            }
+            return ParseResult(
+                status="success",
+                output_file=str(output_path),
+                data=parsed_data
+            )
 
         except Exception as e:
-            return {
-                "status": "error",
-                "message": f"Error parsing text: {str(e)}"
-            }
+            return ParseResult(
+                status="error",
+                message=f"Error parsing text: {str(e)}"
+            )
+
+    def parse_txt_dir_batched(self, txt_dir: Path, output_file: Path) -> List[ParseResult]:
+        """
+        Parse every .txt file of a directory into a single NDJSON file.
+        Writes one {"file": name, "data": {...}} line per parsed text in one
+        writelines() call, instead of opening one JSON file per text.
+
+        Args:
+            txt_dir: Directory with the OCR text files
+            output_file: Path of the NDJSON file to write
+
+        Returns:
+            One ParseResult per text file, in name order
+        """
+        with os.scandir(txt_dir) as entries:
+            txt_files = sorted(
+                entry.path for entry in entries
+                if entry.name.endswith(".txt") and entry.is_file()
+            )
+
+        output_file = Path(output_file)
+        results = []
+        records = []
+        for txt_file in txt_files:
+            try:
+                parsed_data = DataParser.from_txt_file(Path(txt_file)).parse()
+            except Exception as e:
+                results.append(ParseResult(
+                    status="error",
+                    source_file=txt_file,
+                    message=f"Error parsing {os.path.basename(txt_file)}: {str(e)}"
+                ))
+                continue
+            records.append(dumps_json(
+                {"file": os.path.basename(txt_file), "data": parsed_data}, pretty=False
+            ) + b"\n")
+            results.append(ParseResult(
+                status="success",
+                source_file=txt_file,
+                output_file=str(output_file),
+                data=parsed_data
+            ))
+
+        self._ensure_dir(output_file.parent)
+        with open(output_file, 'wb') as f:
+            f.writelines(records)
+        return results
 
     @staticmethod
-    def _extract_year_from_path(path: Path) -> str:
-        """Extract year from file path."""
-        parts = path.parts
-        for part in parts:
+    @lru_cache(maxsize=256)
+    def _extract_year_from_path(directory: str) -> str:
+        """Extract year from a directory path (cached: files share their year folder)."""
+        for part in Path(directory).parts:
             if part.isdigit() and len(part) == 4 and 2000 <= int(part) <= 2100:
                 return part
         return "unknown"
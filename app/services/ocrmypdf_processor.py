@@ -3,31 +3,177 @@ OCRmyPDF Processor Service for adding searchable text layers to scanned PDFs.
 This service uses ocrmypdf to enhance PDFs before OCR text extraction.
 """
 import subprocess
+import importlib.util
 import logging
+import math
+import multiprocessing
+import os
+import signal
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import shutil
 
+from services.pdf_files import iter_pdf_chunks, iter_pdfs
+from services.processed_index import ProcessedIndex
+from services.results import EnhanceResult
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def default_parallelism() -> int:
+    """
+    Square root of the CPU count, used both for the number of files processed
+    at once and for the --jobs given to each ocrmypdf run, so that
+    files x jobs stays close to the number of cores.
+    """
+    return max(1, int(math.sqrt(os.cpu_count() or 1)))
+
+
+# PDFs with at least this many pages get several ocrmypdf jobs each
+LONG_PDF_PAGES = 10
+
+# Seconds one file may take in ocrmypdf before it is killed
+FILE_TIMEOUT = 300
+
+# PyMuPDF (already needed for text extraction) is used to count pages
+_HAS_PYMUPDF = importlib.util.find_spec("fitz") is not None
+
+
+def _page_count(pdf_path: Path) -> int:
+    """Number of pages of a PDF, or 0 if PyMuPDF cannot open it."""
+    import fitz
+
+    try:
+        with fitz.open(str(pdf_path)) as doc:
+            return doc.page_count
+    except Exception:
+        return 0
+
+
+def _run_ocrmypdf(
+    pdf_path: str,
+    output_path: str,
+    language: str,
+    jobs: Optional[int],
+    fast: bool = False
+) -> Optional[str]:
+    """
+    Run OCRmyPDF through its Python API inside a long-lived worker process.
+    The ocrmypdf package, its plugins and Tesseract settings are loaded once
+    per worker instead of once per file.
+    With fast, pages that already have text are skipped, Tesseract runs its
+    LSTM engine only and the output is not optimized (see OCRmyPDFProcessor).
+
+    Returns:
+        None on success, otherwise the error message
+    """
+    import ocrmypdf
+
+    if fast:
+        options = {"skip_text": True, "optimize": 0, "tesseract_oem": 1}
+    else:
+        options = {"force_ocr": True}
+
+    try:
+        ocrmypdf.ocr(
+            pdf_path,
+            output_path,
+            language=language.split("+"),
+            output_type="pdf",
+            jobs=jobs,
+            progress_bar=False,
+            **options
+        )
+    except Exception as e:
+        return f"{type(e).__name__}: {e}"
+    return None
+
+
+def _run_ocrmypdf_child(conn, *args) -> None:
+    """Run _run_ocrmypdf in its own process group and send the result through conn."""
+    os.setpgrp()
+    conn.send(_run_ocrmypdf(*args))
+    conn.close()
+
+
+def _run_ocrmypdf_with_timeout(
+    pdf_path: str,
+    output_path: str,
+    language: str,
+    jobs: Optional[int],
+    fast: bool = False,
+    timeout: float = FILE_TIMEOUT
+) -> Optional[str]:
+    """
+    Run _run_ocrmypdf in a child forked from the warm worker, which inherits
+    the already imported ocrmypdf. The timeout counts from the moment this
+    file starts, not from when it was queued; past it, the child and the
+    tesseract/ghostscript processes it started are killed and the partial
+    output is removed.
+
+    Returns:
+        None on success, otherwise the error message
+
+    Raises:
+        TimeoutError: If the file took longer than timeout seconds
+    """
+    import ocrmypdf  # noqa: F401 (loaded once here, inherited by every child)
+
+    receiver, sender = multiprocessing.Pipe(duplex=False)
+    child = multiprocessing.get_context("fork").Process(
+        target=_run_ocrmypdf_child,
+        args=(sender, pdf_path, output_path, language, jobs, fast)
+    )
+    child.start()
+    sender.close()
+    try:
+        if receiver.poll(timeout):
+            try:
+                return receiver.recv()
+            except EOFError:
+                child.join()
+                return f"ocrmypdf child exited with code {child.exitcode}"
+        for kill in (lambda: os.killpg(child.pid, signal.SIGKILL), child.kill):
+            try:
+                kill()
+            except ProcessLookupError:
+                pass
+        child.join()
+        Path(output_path).unlink(missing_ok=True)
+        raise TimeoutError(f"{pdf_path} took longer than {timeout} seconds")
+    finally:
+        receiver.close()
+        child.join()
+
+
 class OCRmyPDFProcessor:
     """
     Processor service that uses OCRmyPDF to add searchable text layers to PDFs.
     Useful for pre-processing scanned PDFs before text extraction.
     """
 
-    def __init__(self, output_dir: str = "ocr_processed"):
+    def __init__(self, output_dir: str = "ocr_processed", fast: bool = False):
         """
         Initialize the OCRmyPDF Processor.
 
         Args:
             output_dir: Directory where processed PDFs will be saved
+            fast: Throughput preset: skip pages that already have text instead
+                  of forcing OCR on every page, use Tesseract's LSTM engine only
+                  (--tesseract-oem 1, fastest with the tessdata_fast models) and
+                  skip output optimization. Leave it off for maximum accuracy
         """
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.fast = fast
+        
+        # Warm OCRmyPDF workers, only used inside a `with` block (see __enter__)
+        self._reuse_workers = False
+        self._engine_pool = None
         
         # Check if ocrmypdf is installed
         if not self._check_ocrmypdf_installed():
@@ -37,9 +183,42 @@ class OCRmyPDFProcessor:
                 "Also requires: Tesseract OCR and Ghostscript"
             )
 
+    def __enter__(self):
+        """
+        Keep OCRmyPDF loaded across files until the block exits: when the
+        ocrmypdf package is importable, files are processed by a pool of
+        worker processes that import it once, instead of one fresh
+        `ocrmypdf` interpreter per file.
+        """
+        self._reuse_workers = importlib.util.find_spec("ocrmypdf") is not None
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Shut the warm workers down, dropping files that have not started yet."""
+        if self._engine_pool is not None:
+            self._engine_pool.shutdown(cancel_futures=True)
+            self._engine_pool = None
+        self._reuse_workers = False
+
+    def _get_engine_pool(self, size: Optional[int] = None) -> ProcessPoolExecutor:
+        """Create the warm worker pool on first use (spawned: safe to start from threads)."""
+        if self._engine_pool is None:
+            self._engine_pool = ProcessPoolExecutor(
+                max_workers=size or default_parallelism(),
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._engine_pool
+
     @staticmethod
+    @lru_cache(maxsize=1)
     def _check_ocrmypdf_installed() -> bool:
-        """Check if ocrmypdf command is available."""
+        """
+        Check if ocrmypdf command is available.
+        Checked once per process: a PATH lookup first, then a single
+        `ocrmypdf --version` run instead of one per processor created.
+        """
+        if shutil.which("ocrmypdf") is None:
+            return False
         try:
             result = subprocess.run(
                 ["ocrmypdf", "--version"],
@@ -50,7 +229,13 @@ class OCRmyPDFProcessor:
         except (FileNotFoundError, subprocess.TimeoutExpired):
             return False
 
-    def _process_pdf(self, pdf_path: Path, output_path: Path, language: str = "spa") -> Dict[str, str]:
+    def _process_pdf(
+        self,
+        pdf_path: Path,
+        output_path: Path,
+        language: str = "spa",
+        jobs: Optional[int] = None
+    ) -> EnhanceResult:
         """
         Process a single PDF with OCRmyPDF.
 
@@ -58,20 +243,28 @@ class OCRmyPDFProcessor:
             pdf_path: Path to input PDF
             output_path: Path where processed PDF will be saved
             language: Language code for OCR (default: Spanish)
+            jobs: Number of pages ocrmypdf processes in parallel (default: all cores)
 
         Returns:
-            Dictionary with status and details
+            EnhanceResult with status and details
         """
+        if self._reuse_workers:
+            return self._process_pdf_in_worker(pdf_path, output_path, language, jobs)
+
         try:
             # Build ocrmypdf command
             cmd = [
                 "ocrmypdf",
                 "--language", language,
-                "--force-ocr",  # Always perform OCR even if text exists
                 "--output-type", "pdf",  # Output as PDF
-                str(pdf_path),
-                str(output_path)
             ]
+            if self.fast:
+                cmd += ["--skip-text", "--optimize", "0", "--tesseract-oem", "1"]
+            else:
+                cmd += ["--force-ocr"]  # Always perform OCR even if text exists
+            if jobs:
+                cmd += ["--jobs", str(jobs)]
+            cmd += [str(pdf_path), str(output_path)]
 
             logger.info(f"Processing: {pdf_path.name}")
             
@@ -79,43 +272,100 @@ class OCRmyPDFProcessor:
                 cmd,
                 capture_output=True,
                 text=True,
-                timeout=300  # 5 minute timeout per file
+                timeout=FILE_TIMEOUT
             )
 
             if result.returncode == 0:
                 file_size_kb = output_path.stat().st_size / 1024
-                return {
-                    "status": "success",
-                    "filename": pdf_path.name,
-                    "output_path": str(output_path),
-                    "file_size_kb": round(file_size_kb, 2)
-                }
+                return EnhanceResult(
+                    status="success",
+                    filename=pdf_path.name,
+                    output_path=str(output_path),
+                    file_size_kb=round(file_size_kb, 2)
+                )
             else:
-                return {
-                    "status": "error",
-                    "filename": pdf_path.name,
-                    "message": f"OCRmyPDF failed: {result.stderr}"
-                }
+                return EnhanceResult(
+                    status="error",
+                    filename=pdf_path.name,
+                    message=f"OCRmyPDF failed: {result.stderr}"
+                )
 
         except subprocess.TimeoutExpired:
-            return {
-                "status": "error",
-                "filename": pdf_path.name,
-                "message": "Processing timeout (file may be too large)"
-            }
+            return EnhanceResult(
+                status="error",
+                filename=pdf_path.name,
+                message="Processing timeout (file may be too large)"
+            )
         except Exception as e:
-            return {
-                "status": "error",
-                "filename": pdf_path.name,
-                "message": str(e)
-            }
+            return EnhanceResult(
+                status="error",
+                filename=pdf_path.name,
+                message=str(e)
+            )
+
+    def _process_pdf_in_worker(
+        self,
+        pdf_path: Path,
+        output_path: Path,
+        language: str = "spa",
+        jobs: Optional[int] = None
+    ) -> EnhanceResult:
+        """
+        Process a single PDF in one of the warm OCRmyPDF workers.
+        The worker enforces the per-file timeout itself, from the moment the
+        file starts rather than from when it was queued.
+
+        Args:
+            pdf_path: Path to input PDF
+            output_path: Path where processed PDF will be saved
+            language: Language code for OCR (default: Spanish)
+            jobs: Number of pages ocrmypdf processes in parallel
+
+        Returns:
+            EnhanceResult with status and details
+        """
+        logger.info(f"Processing: {pdf_path.name}")
+        try:
+            future = self._get_engine_pool().submit(
+                _run_ocrmypdf_with_timeout,
+                str(pdf_path), str(output_path), language, jobs, self.fast
+            )
+            error = future.result()
+
+            if error is None:
+                file_size_kb = output_path.stat().st_size / 1024
+                return EnhanceResult(
+                    status="success",
+                    filename=pdf_path.name,
+                    output_path=str(output_path),
+                    file_size_kb=round(file_size_kb, 2)
+                )
+            return EnhanceResult(
+                status="error",
+                filename=pdf_path.name,
+                message=f"OCRmyPDF failed: {error}"
+            )
+
+        except TimeoutError:
+            return EnhanceResult(
+                status="error",
+                filename=pdf_path.name,
+                message="Processing timeout (file may be too large)"
+            )
+        except Exception as e:
+            return EnhanceResult(
+                status="error",
+                filename=pdf_path.name,
+                message=str(e)
+            )
 
     def process_single_file(
         self,
         pdf_path: Path,
         output_subdir: str = None,
-        language: str = "spa"
-    ) -> Dict[str, str]:
+        language: str = "spa",
+        jobs: Optional[int] = None
+    ) -> EnhanceResult:
         """
         Process a single PDF file.
 
@@ -123,16 +373,17 @@ class OCRmyPDFProcessor:
             pdf_path: Path to input PDF
             output_subdir: Optional subdirectory for output (e.g., '2020')
             language: Language code for OCR
+            jobs: Number of pages ocrmypdf processes in parallel
 
         Returns:
-            Dictionary with processing result
+            EnhanceResult with processing result
         """
         if not pdf_path.exists():
-            return {
-                "status": "error",
-                "filename": pdf_path.name,
-                "message": f"File not found: {pdf_path}"
-            }
+            return EnhanceResult(
+                status="error",
+                filename=pdf_path.name,
+                message=f"File not found: {pdf_path}"
+            )
 
         # Determine output directory
         if output_subdir:
@@ -145,28 +396,45 @@ class OCRmyPDFProcessor:
         # Create output path
         output_path = output_dir / pdf_path.name
 
-        return self._process_pdf(pdf_path, output_path, language)
+        return self._process_pdf(pdf_path, output_path, language, jobs)
 
     def process_directory(
         self,
         source_dir: Path,
         output_subdir: str = None,
-        language: str = "spa"
+        language: str = "spa",
+        workers: Optional[int] = None,
+        jobs: Optional[int] = None,
+        force: bool = False,
+        chunk_size: Optional[int] = None
     ) -> Dict[str, List[Dict]]:
         """
         Process all PDF files in a directory.
+        Several ocrmypdf runs are executed at once; each one also splits its
+        pages across `jobs` cores (both default to sqrt(cores), or are chosen
+        per PDF length when neither is given, see _split_by_length).
 
         Args:
             source_dir: Directory containing PDFs to process
             output_subdir: Optional subdirectory for output
             language: Language code for OCR
+            workers: Number of PDFs processed at the same time
+            jobs: Number of pages each ocrmypdf run processes in parallel
+            force: Also process PDFs already enhanced by a previous run
+            chunk_size: Read and process the directory this many PDFs at a time,
+                        so huge directories are never listed in memory at once
+                        (None = whole directory, reported in name order)
 
         Returns:
             Dictionary with processing results for each file
         """
-        pdf_files = sorted(source_dir.glob("*.pdf"))
+        if chunk_size:
+            chunks = iter_pdf_chunks(source_dir, chunk_size)
+        else:
+            chunks = iter([sorted(iter_pdfs(source_dir))])
+        chunk = next(chunks, [])
 
-        if not pdf_files:
+        if not chunk:
             return {
                 "status": "no_files",
                 "message": f"No PDF files found in {source_dir}",
@@ -183,24 +451,113 @@ class OCRmyPDFProcessor:
             "status": "processing",
             "source_directory": str(source_dir),
             "output_directory": str(output_dir),
-            "total_files": len(pdf_files),
+            "total_files": 0,
+            "skipped_files": 0,
             "language": language,
             "results": []
         }
 
-        print(f"\nProcessing {len(pdf_files)} PDF files with OCRmyPDF...\n")
+        index = ProcessedIndex(output_dir, settings=f"fast={self.fast} language={language}")
+        if self._reuse_workers:
+            # Short PDFs may use every core at once (see _split_by_length)
+            self._get_engine_pool(
+                workers or (os.cpu_count() if jobs is None else default_parallelism())
+            )
+
+        while chunk:
+            self._process_chunk(
+                sorted(chunk), index, results, output_dir,
+                output_subdir, language, workers, jobs, force
+            )
+            chunk = next(chunks, [])
+
+        return results
 
+    @staticmethod
+    def _split_by_length(
+        pdf_files: List[Path],
+        workers: Optional[int],
+        jobs: Optional[int]
+    ) -> List[Tuple[List[Path], int, int]]:
+        """
+        Decide how many PDFs run at once and how many cores each ocrmypdf run gets.
+        Unless workers or jobs are given, long PDFs (LONG_PDF_PAGES or more,
+        counted with PyMuPDF) run sqrt(cores) at a time with sqrt(cores) jobs
+        each, and short PDFs run one per core with a single job: page-level
+        parallelism only pays off when there are enough pages.
+
+        Returns:
+            List of (PDFs, workers, jobs) groups, processed one after another
+        """
+        if workers or jobs or not _HAS_PYMUPDF:
+            return [(pdf_files, workers or default_parallelism(), jobs or default_parallelism())]
+
+        long_files, short_files = [], []
         for pdf_file in pdf_files:
-            result = self.process_single_file(pdf_file, output_subdir, language)
-            results["results"].append(result)
+            pages = _page_count(pdf_file)
+            (long_files if pages >= LONG_PDF_PAGES else short_files).append(pdf_file)
 
-            status = "✓" if result["status"] == "success" else "✗"
-            if result["status"] == "success":
-                print(f"{status} {pdf_file.name} ({result['file_size_kb']} KB)")
-            else:
-                print(f"{status} {pdf_file.name} - Error: {result.get('message', 'Unknown')}")
+        groups = [
+            (long_files, default_parallelism(), default_parallelism()),
+            (short_files, os.cpu_count() or 1, 1),
+        ]
+        return [group for group in groups if group[0]]
 
-        return results
+    def _process_chunk(
+        self,
+        pdf_files: List[Path],
+        index: ProcessedIndex,
+        results: Dict,
+        output_dir: Path,
+        output_subdir: Optional[str],
+        language: str,
+        workers: Optional[int],
+        jobs: Optional[int],
+        force: bool
+    ):
+        """
+        Enhance one chunk of PDFs of process_directory(), adding the outcome
+        to its results dictionary and recording successes in the index.
+        """
+        fingerprints = index.pending(
+            ((pdf_file, pdf_file, output_dir / pdf_file.name) for pdf_file in pdf_files),
+            force
+        )
+        results["total_files"] += len(pdf_files)
+        skipped = len(pdf_files) - len(fingerprints)
+        results["skipped_files"] += skipped
+        pdf_files = list(fingerprints)
+        if skipped:
+            print(f"Skipping {skipped} PDF files already processed\n")
+
+        if not pdf_files:
+            return
+
+        print(f"\nProcessing {len(pdf_files)} PDF files with OCRmyPDF...\n")
+
+        for group_files, group_workers, group_jobs in self._split_by_length(pdf_files, workers, jobs):
+            # Each file runs in its own ocrmypdf process, so threads are enough.
+            # Largest PDFs are submitted first so a big scan never starts last and
+            # holds up the batch; results are still reported in name order.
+            with ThreadPoolExecutor(max_workers=group_workers) as executor:
+                futures = {
+                    pdf_file: executor.submit(
+                        self.process_single_file, pdf_file, output_subdir, language, group_jobs
+                    )
+                    for pdf_file in sorted(group_files, key=lambda path: path.stat().st_size, reverse=True)
+                }
+
+                for pdf_file in group_files:
+                    result = futures.pop(pdf_file).result()
+                    results["results"].append(result)
+                    if result.status == "success":
+                        index.add(fingerprints[pdf_file])
+
+                    status = "✓" if result.status == "success" else "✗"
+                    if result.status == "success":
+                        print(f"{status} {pdf_file.name} ({result.file_size_kb} KB)")
+                    else:
+                        print(f"{status} {pdf_file.name} - Error: {result.message or 'Unknown'}")
 
     def get_summary(self, processing_results: Dict) -> Dict:
         """
@@ -213,39 +570,55 @@ class OCRmyPDFProcessor:
             Summary statistics
         """
         results = processing_results.get("results", [])
-        successful = [r for r in results if r["status"] == "success"]
-        failed = [r for r in results if r["status"] == "error"]
-
-        total_size = sum(r.get("file_size_kb", 0) for r in successful)
+        successful_count = 0
+        total_size = 0.0
+        failed_files = []
+        for r in results:
+            if r.status == "success":
+                successful_count += 1
+                total_size += r.file_size_kb
+            else:
+                failed_files.append(r.filename)
 
         return {
             "total_processed": len(results),
-            "successful": len(successful),
-            "failed": len(failed),
+            "successful": successful_count,
+            "failed": len(failed_files),
+            "skipped": processing_results.get("skipped_files", 0),
             "total_size_kb": round(total_size, 2),
             "output_directory": processing_results.get("output_directory"),
-            "failed_files": [r.get("filename") for r in failed]
+            "failed_files": failed_files
         }
 
 
 class OCRmyPDFService:
     """Wrapper service for convenient OCRmyPDF operations."""
 
-    def __init__(self, output_dir: str = "ocr_processed"):
+    def __init__(self, output_dir: str = "ocr_processed", fast: bool = False):
         """
         Initialize the OCRmyPDF Service.
 
         Args:
             output_dir: Base directory for processed PDFs
+            fast: Use the throughput preset (see OCRmyPDFProcessor)
         """
-        self.processor = OCRmyPDFProcessor(output_dir)
+        self.processor = OCRmyPDFProcessor(output_dir, fast)
+
+    def __enter__(self):
+        """Keep OCRmyPDF workers warm for every file enhanced inside the block."""
+        self.processor.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.processor.__exit__(exc_type, exc_value, traceback)
 
     def enhance_pdf(
         self,
         pdf_path: str,
         output_subdir: str = None,
-        language: str = "spa"
-    ) -> Dict[str, str]:
+        language: str = "spa",
+        jobs: Optional[int] = None
+    ) -> EnhanceResult:
         """
         Enhance a single PDF with searchable text layer.
 
@@ -253,18 +626,23 @@ class OCRmyPDFService:
             pdf_path: Path to input PDF
             output_subdir: Optional subdirectory for output
             language: Language code for OCR
+            jobs: Number of pages ocrmypdf processes in parallel (default: all cores)
 
         Returns:
-            Processing result dictionary
+            Processing result
         """
         path = Path(pdf_path)
-        return self.processor.process_single_file(path, output_subdir, language)
+        return self.processor.process_single_file(path, output_subdir, language, jobs)
 
     def enhance_directory(
         self,
         source_dir: str,
         output_subdir: str = None,
-        language: str = "spa"
+        language: str = "spa",
+        workers: Optional[int] = None,
+        jobs: Optional[int] = None,
+        force: bool = False,
+        chunk_size: Optional[int] = None
     ) -> Dict[str, List[Dict]]:
         """
         Enhance all PDFs in a directory.
@@ -273,12 +651,18 @@ class OCRmyPDFService:
             source_dir: Directory with PDFs to process
             output_subdir: Optional subdirectory for output
             language: Language code for OCR
+            workers: Number of PDFs processed at the same time
+            jobs: Number of pages each ocrmypdf run processes in parallel
+            force: Also enhance PDFs already enhanced by a previous run
+            chunk_size: Number of PDFs listed and processed at a time (None = all)
 
         Returns:
             Processing results dictionary
         """
         path = Path(source_dir)
-        return self.processor.process_directory(path, output_subdir, language)
+        return self.processor.process_directory(
+            path, output_subdir, language, workers, jobs, force, chunk_size
+        )
 
     def get_output_directory(self) -> Path:
         """Get the base output directory for processed PDFs."""
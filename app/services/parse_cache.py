@@ -0,0 +1,116 @@
+"""
+Fingerprint cache for parsed OCR text files.
+Remembers which content each .txt file had when it was last parsed, so
+unchanged files can reuse their existing JSON instead of being parsed again.
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, Optional
+
+from services import data_parser
+from services.results import ParseResult
+
+# Parser source is part of every fingerprint: editing the extraction rules
+# invalidates all cached results.
+with open(data_parser.__file__, 'rb') as _f:
+    PARSER_VERSION = hashlib.blake2b(_f.read(), digest_size=16).digest()
+
+
+class ParseCache:
+    """
+    Maps each source .txt path to the fingerprint of its last parsed content,
+    the JSON file that parse wrote and a digest of that JSON.
+    """
+
+    FILENAME = ".parse_cache.json"
+
+    def __init__(self, output_base_dir: str = "invoices_json"):
+        """
+        Load the cache stored in the output directory (empty if missing or unreadable).
+
+        Args:
+            output_base_dir: Base directory of the JSON results
+        """
+        self.path = Path(output_base_dir) / self.FILENAME
+        try:
+            with open(self.path, 'rb') as f:
+                self.entries: Dict[str, Dict[str, str]] = json.loads(f.read())
+        except (OSError, ValueError):
+            self.entries = {}
+
+    @staticmethod
+    def fingerprint(txt_path: str) -> str:
+        """Return the BLAKE2b fingerprint of a text file and the parser version."""
+        digest = hashlib.blake2b(PARSER_VERSION, digest_size=16)
+        with open(txt_path, 'rb') as f:
+            digest.update(f.read())
+        return digest.hexdigest()
+
+    def lookup(self, txt_path: str, fingerprint: str, output_path: Path) -> Optional[ParseResult]:
+        """
+        Return the cached result of a text file, or None if it has to be parsed.
+
+        The JSON is only reused if it is still the file this source was parsed
+        into: same path and same content. Any other source with the same year
+        and name writes the same path and invalidates the entry.
+
+        Args:
+            txt_path: Path to the OCR text file
+            fingerprint: Current fingerprint of the file
+            output_path: JSON file the parse would write
+
+        Returns:
+            ParseResult loaded from the existing JSON, or None on a miss
+        """
+        entry = self.entries.get(os.path.abspath(txt_path))
+        if (
+            not isinstance(entry, dict)
+            or entry.get("fingerprint") != fingerprint
+            or entry.get("output") != os.path.abspath(output_path)
+        ):
+            return None
+        try:
+            with open(output_path, 'rb') as f:
+                raw = f.read()
+            if hashlib.blake2b(raw, digest_size=16).hexdigest() != entry.get("digest"):
+                return None
+            data = json.loads(raw)
+        except (OSError, ValueError):
+            return None
+        return ParseResult(
+            status="success",
+            source_file=str(txt_path),
+            output_file=str(output_path),
+            data=data,
+            cached=True
+        )
+
+    def store(self, txt_path: str, fingerprint: str, output_path: str):
+        """
+        Record the fingerprint a text file was parsed with, and the JSON it wrote.
+
+        Args:
+            txt_path: Path to the OCR text file
+            fingerprint: Fingerprint of the parsed content
+            output_path: JSON file written by the parse
+        """
+        try:
+            with open(output_path, 'rb') as f:
+                digest = hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+        except OSError:
+            return
+        self.entries[os.path.abspath(txt_path)] = {
+            "fingerprint": fingerprint,
+            "output": os.path.abspath(output_path),
+            "digest": digest
+        }
+
+    def save(self):
+        """Write the cache atomically (temporary file + os.replace)."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f)
+        os.replace(tmp_path, self.path)
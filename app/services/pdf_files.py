@@ -0,0 +1,52 @@
+"""
+PDF discovery shared by the enhance and webhook services.
+"""
+import os
+from itertools import islice
+from pathlib import Path
+from typing import Iterator, List
+
+
+def iter_pdfs(root: Path, recursive: bool = False) -> Iterator[Path]:
+    """
+    Yield the PDF files of a directory (and its subdirectories if recursive).
+
+    Uses os.scandir so the file/directory checks are answered from the cached
+    directory entry type, without a stat call per file. Symlinked directories
+    are not followed, which also rules out symlink loops.
+
+    Args:
+        root: Directory to search
+        recursive: Whether to search subdirectories
+
+    Returns:
+        Iterator of PDF paths, in directory order
+    """
+    pending = [os.fspath(root)]
+    while pending:
+        with os.scandir(pending.pop()) as entries:
+            for entry in entries:
+                if entry.name.lower().endswith(".pdf") and entry.is_file():
+                    yield Path(entry.path)
+                elif recursive and entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
+
+
+def iter_pdf_chunks(root: Path, chunk_size: int, recursive: bool = False) -> Iterator[List[Path]]:
+    """
+    Yield the PDF files of a directory in lists of up to chunk_size paths,
+    so the whole directory is never held in memory at once.
+
+    Args:
+        root: Directory to search
+        chunk_size: Maximum number of paths per list
+        recursive: Whether to search subdirectories
+
+    Returns:
+        Iterator of path lists, in directory order
+    """
+    pdfs = iter_pdfs(root, recursive)
+    chunk = list(islice(pdfs, chunk_size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(pdfs, chunk_size))
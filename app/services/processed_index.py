@@ -0,0 +1,83 @@
+"""
+Persistent index of the input files a batch step has already processed.
+Re-running a step over the same directory only processes new or changed files.
+"""
+import hashlib
+import os
+from pathlib import Path
+from typing import Dict, Hashable, Iterable, Set, Tuple
+
+# Bytes of each file hashed for its fingerprint (the file size is included too)
+FINGERPRINT_BYTES = 1 << 20
+
+
+class ProcessedIndex:
+    """
+    Set of input fingerprints stored in a text file inside the output directory,
+    one SHA-1 per line. Lines are appended as files finish, so an interrupted
+    run keeps everything it completed.
+    Fingerprints include the processing settings: a run with different
+    settings processes every file again instead of keeping the old outputs.
+    """
+
+    def __init__(self, output_dir: Path, filename: str = ".processed.sha1", settings: str = ""):
+        """
+        Load the index of an output directory (empty if it does not exist yet).
+
+        Args:
+            output_dir: Directory the step writes its results to
+            filename: Name of the index file inside output_dir
+            settings: Description of every setting that changes the output
+        """
+        self.path = Path(output_dir) / filename
+        self.settings = settings
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                self.fingerprints: Set[str] = {line.strip() for line in f if line.strip()}
+        except FileNotFoundError:
+            self.fingerprints = set()
+
+    @staticmethod
+    def fingerprint(file_path: Path, settings: str = "") -> str:
+        """Return the SHA-1 of the file size, its first FINGERPRINT_BYTES bytes and settings."""
+        with open(file_path, "rb") as f:
+            digest = hashlib.sha1(str(os.fstat(f.fileno()).st_size).encode())
+            digest.update(f.read(FINGERPRINT_BYTES))
+        digest.update(settings.encode())
+        return digest.hexdigest()
+
+    def __contains__(self, fingerprint: str) -> bool:
+        return fingerprint in self.fingerprints
+
+    def pending(
+        self,
+        files: Iterable[Tuple[Hashable, Path, Path]],
+        force: bool = False
+    ) -> Dict[Hashable, str]:
+        """
+        Fingerprint the input files and keep those that still need processing.
+        A file is skipped when its fingerprint (with the index settings) is
+        indexed and its output exists.
+
+        Args:
+            files: (key, input_path, output_path) of each file, in processing order
+            force: Keep every file, even those already processed
+
+        Returns:
+            Dictionary {key: fingerprint} of the files to process, in the same order
+        """
+        pending = {}
+        for key, input_path, output_path in files:
+            fingerprint = self.fingerprint(input_path, self.settings)
+            if force or fingerprint not in self.fingerprints or not os.path.exists(output_path):
+                pending[key] = fingerprint
+        return pending
+
+    def add(self, fingerprint: str):
+        """Record a processed file (appended to the index file immediately)."""
+        if fingerprint in self.fingerprints:
+            return
+        self.fingerprints.add(fingerprint)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(fingerprint + "\n")
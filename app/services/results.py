@@ -0,0 +1,55 @@
+"""
+Result records returned by the processing services.
+One record is created per processed file, so they use __slots__ instead of
+a per-instance dict to keep large batches light on memory. Records are frozen
+(nothing changes them once built) and hashable; the parsed data dict is left
+out of the hash.
+"""
+from dataclasses import dataclass, field
+from typing import Any, Dict
+
+
+@dataclass(slots=True, frozen=True)
+class OCRResult:
+    """Outcome of extracting the text of one PDF file."""
+
+    status: str
+    filename: str
+    output_path: str = ""
+    characters_extracted: int = 0
+    message: str = ""
+
+
+@dataclass(slots=True, frozen=True)
+class EnhanceResult:
+    """Outcome of adding a text layer to one PDF file with OCRmyPDF."""
+
+    status: str
+    filename: str
+    output_path: str = ""
+    file_size_kb: float = 0.0
+    message: str = ""
+
+
+@dataclass(slots=True, frozen=True)
+class ParseResult:
+    """Outcome of parsing one OCR text into invoice JSON."""
+
+    status: str
+    source_file: str = ""
+    output_file: str = ""
+    data: Dict[str, Any] = field(default_factory=dict, hash=False)
+    message: str = ""
+    cached: bool = False
+
+
+@dataclass(slots=True, frozen=True)
+class ProcessResult:
+    """Outcome of OCR + parsing of one PDF file."""
+
+    status: str
+    filename: str
+    txt_path: str = ""
+    json_path: str = ""
+    data: Dict[str, Any] = field(default_factory=dict, hash=False)
+    message: str = ""
@@ -3,10 +3,126 @@ Webhook Sender Service for sending PDF files to n8n webhook.
 Automates the process of sending OCR-processed PDFs for further processing.
 """
 import requests
+from requests.adapters import HTTPAdapter
 from pathlib import Path
-from typing import Optional, List, Dict
+from typing import BinaryIO, Optional, List, Dict, Tuple
+import io
 import os
+import sys
+import threading
 import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from services.pdf_files import iter_pdfs
+
+
+class _RateLimiter:
+    """Spaces calls to wait() at least 1/rate seconds apart, across threads."""
+    
+    def __init__(self, rate: Optional[float]):
+        self.interval = 1.0 / rate if rate else 0.0
+        self.next_time = 0.0
+        self.lock = threading.Lock()
+    
+    def wait(self):
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.next_time)
+            self.next_time = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+class _MultipartBody:
+    """
+    multipart/form-data request body read straight from the PDFs on disk.
+    requests' files= argument builds the whole body as one bytes object
+    (a full copy of every PDF in memory); this object is streamed instead,
+    64 KiB at a time, and len() gives requests the Content-Length.
+    """
+    
+    CHUNK_SIZE = 1 << 16
+    
+    def __init__(self, fields: Dict[str, str], files: List[Tuple[str, Path]]):
+        """
+        Args:
+            fields: Form fields (name -> value)
+            files: PDF file fields as (field name, path)
+        """
+        boundary = uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={boundary}"
+        
+        # Parts are header bytes or PDF paths, in body order
+        self._parts = []
+        for name, value in fields.items():
+            self._parts.append(
+                f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode("utf-8")
+            )
+        for name, pdf_path in files:
+            filename = pdf_path.name.replace('"', "%22").replace("\r", "").replace("\n", "")
+            self._parts.append(
+                f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+                f'Content-Type: application/pdf\r\n\r\n'.encode("utf-8")
+            )
+            self._parts.append(pdf_path)
+            self._parts.append(b"\r\n")
+        self._parts.append(f"--{boundary}--\r\n".encode("utf-8"))
+        
+        self.length = sum(
+            len(part) if isinstance(part, bytes) else os.path.getsize(part)
+            for part in self._parts
+        )
+        self._next_part = 0
+        self._current: Optional[BinaryIO] = None
+    
+    def __len__(self) -> int:
+        return self.length
+    
+    def __iter__(self):
+        chunk = self.read(self.CHUNK_SIZE)
+        while chunk:
+            yield chunk
+            chunk = self.read(self.CHUNK_SIZE)
+    
+    def _open_next(self) -> Optional[BinaryIO]:
+        if self._next_part == len(self._parts):
+            return None
+        part = self._parts[self._next_part]
+        self._next_part += 1
+        return io.BytesIO(part) if isinstance(part, bytes) else open(part, "rb")
+    
+    def read(self, size: int = -1) -> bytes:
+        """Read up to size bytes of the body (everything left if size < 0)."""
+        if self._current is None and self._next_part == 0:
+            self._current = self._open_next()
+        out = bytearray()
+        while self._current is not None and (size < 0 or len(out) < size):
+            data = self._current.read(-1 if size < 0 else size - len(out))
+            if data:
+                out += data
+            else:
+                self._current.close()
+                self._current = self._open_next()
+        return bytes(out)
+    
+    def close(self):
+        if self._current is not None:
+            self._current.close()
+            self._current = None
+    
+    def post(self, session: requests.Session, url: str, timeout: float) -> requests.Response:
+        """POST this body to url through session."""
+        try:
+            return session.post(
+                url,
+                data=self,
+                headers={"Content-Type": self.content_type},
+                timeout=timeout
+            )
+        finally:
+            self.close()
 
 
 class WebhookSenderService:
@@ -16,6 +132,18 @@ class WebhookSenderService:
     
     DEFAULT_WEBHOOK_URL = "https://n8n.jatenx.pro/webhook-test/e37077b5-31c1-4da2-aca9-ce0286b4ea3b"
     
+    # Retries of a batched request: exponential backoff between BACKOFF_MIN and BACKOFF_MAX seconds
+    MAX_RETRIES = 3
+    BACKOFF_MIN = 1.0
+    BACKOFF_MAX = 30.0
+    
+    # Keep-alive connections kept open to the webhook host (raised to the
+    # concurrency of send_directory when it is higher)
+    POOL_SIZE = 8
+    
+    # Progress lines of concurrent sends written per write() call
+    PROGRESS_BATCH = 16
+    
     def __init__(self, webhook_url: str = None):
         """
         Initialize the Webhook Sender Service.
@@ -24,6 +152,35 @@ class WebhookSenderService:
             webhook_url: URL of the n8n webhook endpoint (uses default if not provided)
         """
         self.webhook_url = webhook_url or self.DEFAULT_WEBHOOK_URL
+        # One session for every request: TCP and TLS connections are reused
+        # (HTTP keep-alive) instead of a new handshake per file
+        self.session = requests.Session()
+        self._adapter: Optional[HTTPAdapter] = None
+        self._pool_size = 0
+        self._mount_adapter(self.POOL_SIZE)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def close(self):
+        """Close the session and its pooled connections."""
+        self.session.close()
+    
+    def _mount_adapter(self, pool_size: int):
+        """Give the session a connection pool of at least pool_size connections."""
+        if pool_size <= self._pool_size:
+            return
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        # The replaced pool would otherwise keep its idle connections open
+        if self._adapter is not None:
+            self._adapter.close()
+        self._adapter = adapter
+        self._pool_size = pool_size
     
     def send_pdf(self, pdf_path: str, metadata: Dict = None) -> Dict:
         """
@@ -53,30 +210,24 @@ class WebhookSenderService:
             }
         
         try:
-            with open(pdf_path, "rb") as f:
-                files = {
-                    "file": (pdf_path.name, f, "application/pdf")
-                }
-                
-                # Include metadata if provided
-                data = metadata or {}
-                data["filename"] = pdf_path.name
-                data["filepath"] = str(pdf_path)
-                
-                response = requests.post(
-                    self.webhook_url,
-                    files=files,
-                    data=data,
-                    timeout=120  # 2 minutes timeout for large files
-                )
-                
-                return {
-                    "success": response.status_code in [200, 201, 202],
-                    "status_code": response.status_code,
-                    "response": response.text,
-                    "file": pdf_path.name
-                }
-                
+            # Include metadata if provided
+            data = metadata or {}
+            data["filename"] = pdf_path.name
+            data["filepath"] = str(pdf_path)
+            
+            response = _MultipartBody(data, [("file", pdf_path)]).post(
+                self.session,
+                self.webhook_url,
+                timeout=120  # 2 minutes timeout for large files
+            )
+            
+            return {
+                "success": response.status_code in [200, 201, 202],
+                "status_code": response.status_code,
+                "response": response.text,
+                "file": pdf_path.name
+            }
+        
         except requests.exceptions.Timeout:
             return {
                 "success": False,
@@ -90,11 +241,74 @@ class WebhookSenderService:
                 "file": pdf_path.name
             }
     
+    def send_batch(self, pdf_paths: List[Path]) -> Dict:
+        """
+        Send several PDF files to the webhook in one multipart request.
+        Files are sent as fields file_0..file_{N-1} (with matching filename_i);
+        timeouts, connection errors and 5xx responses are retried with
+        exponential backoff.
+        
+        Args:
+            pdf_paths: PDF files to send together
+            
+        Returns:
+            Dict with response status and the names of the files sent
+        """
+        names = [pdf_path.name for pdf_path in pdf_paths]
+        delay = self.BACKOFF_MIN
+        
+        for attempt in range(self.MAX_RETRIES + 1):
+            try:
+                files = []
+                data = {"count": str(len(pdf_paths))}
+                for i, pdf_path in enumerate(pdf_paths):
+                    files.append((f"file_{i}", pdf_path))
+                    data[f"filename_{i}"] = pdf_path.name
+                    data[f"filepath_{i}"] = str(pdf_path)
+                
+                response = _MultipartBody(data, files).post(
+                    self.session,
+                    self.webhook_url,
+                    timeout=120 * len(pdf_paths)  # 2 minutes per file, as in send_pdf
+                )
+                
+                if response.status_code < 500 or attempt == self.MAX_RETRIES:
+                    return {
+                        "success": response.status_code in [200, 201, 202],
+                        "status_code": response.status_code,
+                        "response": response.text,
+                        "files": names
+                    }
+                error = f"HTTP {response.status_code}"
+            
+            except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+                error = "Request timeout" if isinstance(e, requests.exceptions.Timeout) else str(e)
+                if attempt == self.MAX_RETRIES:
+                    break
+            except (OSError, requests.exceptions.RequestException) as e:
+                return {
+                    "success": False,
+                    "error": str(e),
+                    "files": names
+                }
+            
+            time.sleep(delay)
+            delay = min(delay * 2, self.BACKOFF_MAX)
+        
+        return {
+            "success": False,
+            "error": error,
+            "files": names
+        }
+    
     def send_directory(
         self, 
         directory: str, 
         recursive: bool = False,
-        delay_between: float = 1.0
+        delay_between: float = 1.0,
+        batch_size: int = 1,
+        concurrency: int = 1,
+        rate: Optional[float] = None
     ) -> Dict:
         """
         Send all PDF files from a directory to the webhook.
@@ -102,7 +316,11 @@ class WebhookSenderService:
         Args:
             directory: Path to directory containing PDF files
             recursive: Whether to search subdirectories
-            delay_between: Delay in seconds between each file send (to avoid rate limiting)
+            delay_between: Delay in seconds between each file send (to avoid rate limiting);
+                           only applied to sequential, unbatched sends
+            batch_size: Number of PDFs sent per request (1 = one request per file)
+            concurrency: Number of requests in flight at the same time
+            rate: Maximum requests started per second when concurrency > 1 (None = unlimited)
             
         Returns:
             Dict with summary of all operations
@@ -116,10 +334,7 @@ class WebhookSenderService:
             }
         
         # Find all PDF files
-        if recursive:
-            pdf_files = list(directory.rglob("*.pdf"))
-        else:
-            pdf_files = list(directory.glob("*.pdf"))
+        pdf_files = list(iter_pdfs(directory, recursive))
         
         if not pdf_files:
             return {
@@ -138,22 +353,65 @@ class WebhookSenderService:
         print(f"   Webhook: {self.webhook_url}")
         print("-" * 50)
         
-        for i, pdf_path in enumerate(pdf_files, 1):
-            print(f"[{i}/{len(pdf_files)}] Sending: {pdf_path.name}...", end=" ")
-            
-            result = self.send_pdf(str(pdf_path))
+        # One request per file, or per group of batch_size files
+        if batch_size > 1:
+            batches = [pdf_files[start:start + batch_size] for start in range(0, len(pdf_files), batch_size)]
+        else:
+            batches = [[pdf_path] for pdf_path in pdf_files]
+        
+        def send(batch: List[Path]) -> Dict:
+            if batch_size <= 1:
+                return self.send_pdf(str(batch[0]))
+            return self.send_batch(batch)
+        
+        def label(index: int) -> str:
+            batch = batches[index]
+            if batch_size <= 1:
+                return f"[{index + 1}/{len(pdf_files)}] Sending: {batch[0].name}..."
+            first = index * batch_size + 1
+            return f"[{first}-{first + len(batch) - 1}/{len(pdf_files)}] Sending {len(batch)} files..."
+        
+        # Progress lines, one per request; written 16 at a time when requests run
+        # concurrently, right away when they are sent one by one
+        progress = []
+        progress_batch = self.PROGRESS_BATCH if concurrency > 1 else 1
+        
+        def report(index: int, result: Dict, count: int):
+            nonlocal sent_count, failed_count
             results.append(result)
-            
             if result["success"]:
-                print("✅")
-                sent_count += 1
+                progress.append(f"{label(index)} ✅\n")
+                sent_count += count
             else:
-                print(f"❌ {result.get('error', 'Unknown error')}")
-                failed_count += 1
+                progress.append(f"{label(index)} ❌ {result.get('error', result.get('status_code', 'Unknown error'))}\n")
+                failed_count += count
+            if len(progress) >= progress_batch:
+                sys.stdout.write("".join(progress))
+                sys.stdout.flush()
+                progress.clear()
+        
+        if concurrency > 1:
+            # Requests are network-bound: keep `concurrency` of them in flight,
+            # started at most `rate` times per second; report in directory order
+            limiter = _RateLimiter(rate)
+            self._mount_adapter(concurrency)
+            
+            def send_limited(batch: List[Path]) -> Dict:
+                limiter.wait()
+                return send(batch)
             
-            # Delay between files to avoid overwhelming the webhook
-            if i < len(pdf_files) and delay_between > 0:
-                time.sleep(delay_between)
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                futures = [executor.submit(send_limited, batch) for batch in batches]
+                for i, future in enumerate(futures):
+                    report(i, future.result(), len(batches[i]))
+            sys.stdout.write("".join(progress))
+        else:
+            for i, batch in enumerate(batches):
+                report(i, send(batch), len(batch))
+                
+                # Delay between files to avoid overwhelming the webhook
+                if batch_size <= 1 and i < len(batches) - 1 and delay_between > 0:
+                    time.sleep(delay_between)
         
         print("-" * 50)
         print(f"✅ Sent: {sent_count} | ❌ Failed: {failed_count} | Total: {len(pdf_files)}")
@@ -166,13 +424,21 @@ class WebhookSenderService:
             "results": results
         }
     
-    def send_year(self, year: str, base_dir: str = None) -> Dict:
+    def send_year(
+        self,
+        year: str,
+        base_dir: str = None,
+        batch_size: int = 1,
+        concurrency: int = 1,
+        rate: Optional[float] = None
+    ) -> Dict:
         """
         Send all PDF files from a specific year's ocr_processed folder.
         
         Args:
             year: Year folder to process (e.g., "2024")
             base_dir: Base directory (defaults to app/ocr_processed)
+            batch_size: Number of PDFs sent per request
             
         Returns:
             Dict with summary of operations
@@ -192,14 +458,28 @@ class WebhookSenderService:
             }
         
         print(f"\n📁 Processing year: {year}")
-        return self.send_directory(str(year_dir))
+        return self.send_directory(
+            str(year_dir),
+            batch_size=batch_size,
+            concurrency=concurrency,
+            rate=rate
+        )
     
-    def send_all_years(self, base_dir: str = None) -> Dict:
+    def send_all_years(
+        self,
+        base_dir: str = None,
+        batch_size: int = 1,
+        concurrency: int = 1,
+        rate: Optional[float] = None
+    ) -> Dict:
         """
         Send all PDF files from all year folders in ocr_processed.
         
         Args:
             base_dir: Base directory (defaults to app/ocr_processed)
+            batch_size: Number of PDFs sent per request
+            concurrency: Number of requests in flight at the same time
+            rate: Maximum requests started per second (None = unlimited)
             
         Returns:
             Dict with summary of all operations by year
@@ -216,8 +496,11 @@ class WebhookSenderService:
             }
         
         # Find all year directories
-        year_dirs = [d for d in base_dir.iterdir() if d.is_dir() and d.name.isdigit()]
-        year_dirs.sort(key=lambda x: x.name)
+        with os.scandir(base_dir) as entries:
+            year_dirs = sorted(
+                (Path(entry.path) for entry in entries if entry.name.isdigit() and entry.is_dir()),
+                key=lambda x: x.name
+            )
         
         if not year_dirs:
             return {
@@ -231,7 +514,7 @@ class WebhookSenderService:
         total_failed = 0
         
         for year_dir in year_dirs:
-            result = self.send_year(year_dir.name, str(base_dir))
+            result = self.send_year(year_dir.name, str(base_dir), batch_size, concurrency, rate)
             results[year_dir.name] = result
             total_sent += result.get("sent", 0)
             total_failed += result.get("failed", 0)